@@ -0,0 +1,64 @@
+#!/usr/bin/python
+"""
+Microbenchmark for PowerConsul_Collection construction and attribute lookup on
+configuration sized inputs, compared against the previous JSON round trip.
+
+Usage: python benchmarks/collection.py
+"""
+import re
+import json
+from timeit import timeit
+from collections import namedtuple
+
+from powerconsul.common.collection import PowerConsul_Collection
+
+# Local configuration / Consul agent configuration sized inputs
+LOCAL_CONFIG  = {
+    'serviceFilter': '^production-webserver[0-9]*$',
+    'clusterKey': 'cluster/production',
+    'datacenterTTL': 3600,
+    'subVars': {'ENV': 'production', 'ROLE': 'webserver', 'SERVER': 'apache2'},
+    'noopTriggers': ['sshd', 'ntpd']
+}
+CONSUL_CONFIG = {
+    'datacenter': 'dc1',
+    'data_dir': '/opt/consul',
+    'log_level': 'INFO',
+    'node_name': 'production-webserver1',
+    'server': False,
+    'retry_join': ['10.0.0.1', '10.0.0.2', '10.0.0.3'],
+    'ports': {'dns': 8600, 'http': 8500, 'serf_lan': 8301, 'serf_wan': 8302},
+    'addresses': {'http': '127.0.0.1', 'dns': '127.0.0.1'},
+    'telemetry': {'statsd_address': '127.0.0.1:8125', 'disable_hostname': True},
+    'acl': {'enabled': True, 'default_policy': 'deny', 'tokens': {'agent': 'x' * 36}}
+}
+
+def legacy_create(data):
+    """
+    Previous implementation: regex class test, then a JSON round trip building a
+    new named tuple class for every dictionary.
+    """
+    for key, obj in data.iteritems():
+        re.match(r'^<powerconsul\..[^>]*>$', str(obj))
+        re.match(r'^<class \'powerconsul\..*\.{0}\'>$'.format(key), repr(obj.__class__))
+    return json.loads(json.dumps(data), object_hook=lambda d: namedtuple('PowerConsul_Collection', d.keys())(*d.values()))
+
+def report(label, legacy, current):
+    print('{0:<24} legacy={1:>9.2f}us  current={2:>9.2f}us  speedup={3:.1f}x'.format(label, legacy, current, legacy / current))
+
+if __name__ == '__main__':
+    number = 2000
+
+    # Construction
+    for label, data in [('create(local)', LOCAL_CONFIG), ('create(consul)', CONSUL_CONFIG)]:
+        legacy  = timeit(lambda: legacy_create(data), number=number) / number * 1e6
+        current = timeit(lambda: PowerConsul_Collection.create(data), number=number) / number * 1e6
+        report(label, legacy, current)
+
+    # Attribute lookup
+    legacy_obj  = legacy_create(CONSUL_CONFIG)
+    current_obj = PowerConsul_Collection.create(CONSUL_CONFIG)
+    number      = 200000
+    legacy      = timeit(lambda: (legacy_obj.datacenter, legacy_obj.ports.http, getattr(legacy_obj, 'missing', None)), number=number) / number * 1e6
+    current     = timeit(lambda: (current_obj.datacenter, current_obj.ports.http, getattr(current_obj, 'missing', None)), number=number) / number * 1e6
+    report('lookup(consul)', legacy, current)
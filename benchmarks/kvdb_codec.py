@@ -0,0 +1,77 @@
+#!/usr/bin/python
+"""
+Benchmark for decoding KV values over a realistic mix of value types and sizes,
+comparing the previous trial-and-error decoder with untagged (sniffed) and
+tagged decoding.
+
+Usage: python benchmarks/kvdb_codec.py
+"""
+import json
+from timeit import timeit
+
+from powerconsul.kvdb.codec import PowerConsul_KVCodec
+
+# Cluster documents
+CLUSTER_SMALL = {'active_nodes': ['production-app1'], 'standby_nodes': ['production-app2']}
+CLUSTER_LARGE = {'filter': dict(('^production-app{0}[0-9]*$'.format(i), {
+    'active_nodes': ['production-app{0}{1}'.format(i, n) for n in range(4)],
+    'standby_nodes': ['production-app{0}{1}'.format(i, n) for n in range(4, 8)]
+}) for i in range(20))}
+
+# Value mix: (label, value, weight)
+VALUES = [
+    ('role flag', 'START', 30),
+    ('role flag', 'NULL', 30),
+    ('boolean', 'true', 5),
+    ('integer', 42, 5),
+    ('float', 3.5, 5),
+    ('trigger', '/usr/bin/env service apache2 start', 10),
+    ('cluster json (small)', CLUSTER_SMALL, 10),
+    ('cluster json (large)', CLUSTER_LARGE, 5)
+]
+
+def legacy_load(data):
+    """
+    Previous decoder: try each parser in turn, raising and catching on failure.
+    """
+    try:
+        if data in ['1', 'true', 'True']:
+            return True
+        if data in ['0', 'false', 'False']:
+            return False
+        raise Exception('Could not parse boolean value from: {0}'.format(data))
+    except: pass
+    try:
+        raise NameError('string')
+    except: pass
+    try:
+        return float(data)
+    except: pass
+    try:
+        return int(data)
+    except: pass
+    try:
+        return json.loads(data)
+    except: pass
+    return data
+
+if __name__ == '__main__':
+    number  = 20000
+    encoded = [(label, PowerConsul_KVCodec.dump(value), weight) for label, value, weight in VALUES]
+
+    # Per value type
+    for label, (data, flags), weight in encoded:
+        legacy = timeit(lambda: legacy_load(data), number=number) / number * 1e6
+        sniff  = timeit(lambda: PowerConsul_KVCodec.load(data), number=number) / number * 1e6
+        tagged = timeit(lambda: PowerConsul_KVCodec.load(data, flags), number=number) / number * 1e6
+        print('{0:<22} {1:>6}B  legacy={2:>8.2f}us  sniff={3:>8.2f}us  tagged={4:>8.2f}us'.format(label, len(data), legacy, sniff, tagged))
+
+    # Weighted mix
+    mix = []
+    for label, (data, flags), weight in encoded:
+        mix.extend([(data, flags)] * weight)
+    number = 200
+    legacy = timeit(lambda: [legacy_load(d) for d, f in mix], number=number) / number / len(mix) * 1e6
+    sniff  = timeit(lambda: [PowerConsul_KVCodec.load(d) for d, f in mix], number=number) / number / len(mix) * 1e6
+    tagged = timeit(lambda: [PowerConsul_KVCodec.load(d, f) for d, f in mix], number=number) / number / len(mix) * 1e6
+    print('{0:<30} legacy={1:>8.2f}us  sniff={2:>8.2f}us  tagged={3:>8.2f}us'.format('weighted mix (per value)', legacy, sniff, tagged))
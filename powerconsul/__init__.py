@@ -23,7 +23,9 @@ class PowerConsul(object):
 
         # If not running the config handler
         if argv[0] != 'config':
-            POWERCONSUL.CONFIG.parse()
+            with POWERCONSUL.TRACE.span('config'):
+                POWERCONSUL.CONFIG.parse()
+                POWERCONSUL.TRACE.path = POWERCONSUL.CONFIG.traceFile
 
         # Run the target command
         return command().run()
@@ -42,7 +44,8 @@ class PowerConsul(object):
 
         # Pass to handler
         if (len(argv) > 1) and (argv[1] in handlers):
-            cls._run_handler(argv[1])
+            with POWERCONSUL.TRACE.span('powerconsul', command=' '.join(argv[1:3])):
+                cls._run_handler(argv[1])
 
         # Base commands
         else:
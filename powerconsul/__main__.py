@@ -1,9 +1,18 @@
-from powerconsul import PowerConsul
-from powerconsul.common import init_powerconsul
+from sys import argv, exit
+from powerconsul.agentd.client import PowerConsul_AgentdClient
 
 # Launch Power Consul command line utilities
 def main():
 
+    # Hand off to the agent daemon if running
+    code = PowerConsul_AgentdClient.forward(argv[1:])
+    if code is not None:
+        exit(code)
+
+    # Deferred so forwarded commands skip loading Power Consul commons
+    from powerconsul import PowerConsul
+    from powerconsul.common import init_powerconsul
+
     # Initialize Power Consul commons
     init_powerconsul()
 
@@ -0,0 +1,8 @@
+# Default Unix socket for the resident check daemon
+AGENTD_SOCKET   = '/var/run/powerconsul/agentd.sock'
+
+# Commands the daemon will run on behalf of a client
+AGENTD_COMMANDS = ['check']
+
+# Seconds a client waits for a forwarded command to complete
+AGENTD_TIMEOUT  = 60
@@ -0,0 +1,67 @@
+import json
+import socket
+from os.path import exists
+from os import environ, getcwd
+from sys import stdout, stderr
+
+# Power Consul modules
+from powerconsul.agentd import AGENTD_SOCKET, AGENTD_COMMANDS, AGENTD_TIMEOUT
+
+class PowerConsul_AgentdClient(object):
+    """
+    Minimal client for forwarding commands to a running agent daemon. This module
+    must stay free of heavy imports, it runs before any Power Consul commons.
+    """
+    @staticmethod
+    def supported(args, socket_path=AGENTD_SOCKET):
+        """
+        Check if a command can be forwarded to the agent daemon.
+        """
+        return bool(args) and (args[0] in AGENTD_COMMANDS) and exists(socket_path)
+
+    @staticmethod
+    def _recv(conn):
+        """
+        Read the full daemon response until the connection is closed.
+        """
+        chunks = []
+        while True:
+            chunk = conn.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return ''.join(chunks)
+
+    @classmethod
+    def forward(cls, args, socket_path=AGENTD_SOCKET, timeout=AGENTD_TIMEOUT):
+        """
+        Forward command arguments, the environment and working directory to the agent
+        daemon and replay the output. Returns the command exit code, or None if the
+        daemon could not be reached.
+        """
+        if not cls.supported(args, socket_path):
+            return None
+
+        # Connect to the daemon, fall back to running in process if unavailable
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.settimeout(timeout)
+        try:
+            conn.connect(socket_path)
+        except socket.error:
+            conn.close()
+            return None
+
+        # The command has been handed off, any failure from here on is critical
+        try:
+            conn.sendall('{0}\n'.format(json.dumps({'argv': args, 'env': dict(environ), 'cwd': getcwd()})))
+            response = json.loads(cls._recv(conn))
+        except Exception as e:
+            stderr.write('Failed to run command via agent daemon: {0}\n'.format(str(e)))
+            return 2
+        finally:
+            conn.close()
+
+        # Replay the command output
+        stdout.write(response.get('stdout', ''))
+        stderr.write(response.get('stderr', ''))
+        return response.get('code', 2)
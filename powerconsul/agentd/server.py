@@ -0,0 +1,174 @@
+import os
+import json
+import signal
+from sys import argv, stdout, stderr, exit
+from tempfile import TemporaryFile
+from traceback import format_exc
+from importlib import import_module
+from SocketServer import ForkingMixIn, UnixStreamServer, StreamRequestHandler
+
+# Power Consul modules
+from powerconsul import PowerConsul
+from powerconsul.api import PowerConsul_API
+from powerconsul.common.trace import PowerConsul_Trace
+from powerconsul.agentd import AGENTD_SOCKET, AGENTD_COMMANDS
+
+class PowerConsul_AgentdRequest(StreamRequestHandler):
+    """
+    Request handler for a single forwarded command. Each request runs in a child
+    process forked from the warm daemon, so global command state never leaks
+    between requests.
+    """
+    def _reply(self, code, out='', err=''):
+        """
+        Write the command results back to the client.
+        """
+        self.wfile.write(json.dumps({
+            'code': code,
+            'stdout': out,
+            'stderr': err
+        }))
+        self.wfile.flush()
+
+    def _run(self, args, env, cwd):
+        """
+        Run a Power Consul command with the client environment and working directory,
+        capturing output and the exit code.
+        """
+        out  = TemporaryFile()
+        err  = TemporaryFile()
+        code = 0
+
+        # Run as if started from the client shell, probes inherit the environment
+        os.environ.clear()
+        os.environ.update(env)
+        os.chdir(cwd)
+
+        # Redirect standard output/error at the descriptor level to capture subprocesses too
+        stdout.flush()
+        stderr.flush()
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+
+        # Default signal handling for the command
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+        # Pooled connections inherited from the daemon cannot be shared between children / new trace
+        PowerConsul_API.reset()
+        PowerConsul_Trace.reset()
+
+        # Run the command as if called from the command line
+        argv[:] = ['powerconsul'] + args
+        try:
+            PowerConsul.run()
+        except SystemExit as e:
+            if e.code is None:
+                code = 0
+            elif isinstance(e.code, int):
+                code = e.code
+            else:
+                stderr.write('{0}\n'.format(e.code))
+                code = 1
+        except Exception:
+            stderr.write(format_exc())
+            code = 2
+
+        # Forked children exit without running exit handlers
+        PowerConsul_Trace.flush()
+
+        # Read back the command output
+        stdout.flush()
+        stderr.flush()
+        out.seek(0)
+        err.seek(0)
+        return code, out.read(), err.read()
+
+    def handle(self):
+        """
+        Handle a forwarded command request.
+        """
+        try:
+            request = json.loads(self.rfile.readline())
+            args    = request['argv']
+            env     = dict((k.encode('utf-8'), v.encode('utf-8')) for k, v in request['env'].iteritems())
+            cwd     = request['cwd'].encode('utf-8')
+        except Exception as e:
+            return self._reply(2, err='Invalid agent daemon request: {0}\n'.format(str(e)))
+
+        # Only run supported commands
+        if not args or not args[0] in AGENTD_COMMANDS:
+            return self._reply(2, err='Unsupported agent daemon command: {0}\n'.format(' '.join(args)))
+
+        # Client working directory must exist
+        if not os.path.isdir(cwd):
+            return self._reply(2, err='Invalid agent daemon working directory: {0}\n'.format(cwd))
+
+        # Run the command
+        self._reply(*self._run(args, env, cwd))
+
+class PowerConsul_AgentdServer(ForkingMixIn, UnixStreamServer):
+    """
+    Forking Unix socket server for the resident check daemon.
+    """
+    max_children = 64
+
+class PowerConsul_Agentd(object):
+    """
+    Resident daemon which keeps Power Consul commons warm and runs forwarded checks.
+    """
+    def __init__(self, socket_path=AGENTD_SOCKET):
+        self.socket_path = socket_path
+        self.server      = None
+
+    def _warm(self):
+        """
+        Load everything a check needs before the first request arrives.
+        """
+
+        # Consul datacenters
+        POWERCONSUL.LOG.info('datacenters={0}'.format(','.join(POWERCONSUL.datacenters)), method='agentd._warm')
+
+        # Check handler and check code
+        POWERCONSUL.HANDLERS.load('check')
+        for check in ['service', 'servicegroup', 'crontab', 'process']:
+            import_module('powerconsul.common.checks.{0}'.format(check))
+
+    def _bind(self):
+        """
+        Bind the daemon socket, replacing any stale socket file.
+        """
+        socket_dir = os.path.dirname(self.socket_path)
+        if not os.path.isdir(socket_dir):
+            os.makedirs(socket_dir, 0755)
+
+        # Remove a stale socket
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        # Only root can submit commands
+        self.server = PowerConsul_AgentdServer(self.socket_path, PowerConsul_AgentdRequest)
+        os.chmod(self.socket_path, 0600)
+
+    def _shutdown(self, signum, frame):
+        """
+        Exit cleanly on a termination signal.
+        """
+        POWERCONSUL.LOG.info('Received signal {0}, shutting down...'.format(signum), method='agentd._shutdown')
+        exit(0)
+
+    def serve(self):
+        """
+        Serve forwarded commands until terminated.
+        """
+        self._warm()
+        self._bind()
+        signal.signal(signal.SIGTERM, self._shutdown)
+
+        # Serve until shut down
+        POWERCONSUL.LOG.info('Listening on: {0}'.format(self.socket_path), method='agentd.serve')
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
@@ -0,0 +1,209 @@
+from os import getpid
+from time import time
+from threading import local, Lock
+from consul.std import Consul, HTTPClient
+from multiprocessing.pool import ThreadPool
+from powerconsul.api.metrics import PowerConsul_Metrics
+
+# Maximum concurrent requests when fanning out across datacenters
+FANOUT_WORKERS = 8
+
+# Maximum milliseconds since a server last contacted the leader for a stale read
+MAX_STALE      = 5000
+
+# Consistency of the last read made by each thread
+_LAST          = local()
+
+# Marks fan-out worker threads, which must not fan out again on the same pool
+_WORKER        = local()
+
+class PowerConsul_HTTPClient(HTTPClient):
+    """
+    Instrumented HTTP client. Stale reads that lag the leader by more than max_stale
+    milliseconds are retried with default consistency. Requests give up after timeout
+    seconds if set. Every request is recorded with PowerConsul_Metrics.
+    """
+    def __init__(self, *args, **kwargs):
+        self.max_stale   = kwargs.pop('max_stale', MAX_STALE)
+        self.timeout     = kwargs.pop('timeout', None)
+        super(PowerConsul_HTTPClient, self).__init__(*args, **kwargs)
+
+        # Consistency mode for health reads: default, stale or consistent
+        self.consistency = 'default'
+
+    def _request(self, method, path, params=None, data=None):
+        """
+        Make an instrumented request.
+        """
+        uri    = self.uri(path, params)
+        kwargs = {} if data is None else {'data': data}
+        start  = time()
+        try:
+            response = getattr(self.session, method)(uri, verify=self.verify, cert=self.cert, timeout=self.timeout, **kwargs)
+        except Exception:
+            PowerConsul_Metrics.record(method, path, params, 'error', 0, time() - start)
+            raise
+        PowerConsul_Metrics.record(method, path, params, response.status_code, len(response.content), time() - start)
+        return self.response(response)
+
+    def _get(self, path, params, consistency):
+        """
+        Make a GET request and record its consistency headers for this thread.
+        """
+        response = self._request('get', path, params)
+
+        # Consistency of the response
+        _LAST.contact = {
+            'consistency': consistency,
+            'last_contact': int(response.headers.get('X-Consul-LastContact') or 0),
+            'known_leader': response.headers.get('X-Consul-KnownLeader', 'true') == 'true'
+        }
+        return response
+
+    def get(self, callback, path, params=None):
+        params      = list(params or [])
+        consistency = ([k for k, v in params if k in ('stale', 'consistent')] or ['default'])[0]
+
+        # KV and catalog reads get the consistency mode from python-consul, health reads do not
+        if (consistency == 'default') and (self.consistency != 'default') and path.startswith('/v1/health/'):
+            consistency = self.consistency
+            params.append((consistency, '1'))
+        response = self._get(path, params, consistency)
+
+        # Stale data is too old or the server has no leader, read from the leader
+        if (consistency == 'stale') and (response.code == 200):
+            if (_LAST.contact['last_contact'] > self.max_stale) or not _LAST.contact['known_leader']:
+                response = self._get(path, [(k, v) for k, v in params if k != 'stale'], 'default')
+        return callback(response)
+
+    def put(self, callback, path, params=None, data=''):
+        return callback(self._request('put', path, params, data))
+
+    def delete(self, callback, path, params=None):
+        return callback(self._request('delete', path, params))
+
+    def post(self, callback, path, params=None, data=''):
+        return callback(self._request('post', path, params, data))
+
+class PowerConsul_Consul(Consul):
+    """
+    Consul API client using PowerConsul_HTTPClient.
+    """
+    def __init__(self, consistency='default', max_stale=MAX_STALE, timeout=None, **kwargs):
+        self.max_stale = max_stale
+        self.timeout   = timeout
+        super(PowerConsul_Consul, self).__init__(consistency=consistency, **kwargs)
+        self.http.consistency = consistency
+
+    def connect(self, host, port, scheme, verify=True, cert=None):
+        return PowerConsul_HTTPClient(host, port, scheme, verify, cert, max_stale=self.max_stale, timeout=self.timeout)
+
+class PowerConsul_API(object):
+    """
+    Process-wide Consul API client. Every Power Consul module shares the same client,
+    so all requests reuse pooled keep-alive connections to the agent.
+    """
+
+    # Shared client / clients by consistency mode, stale read bound and timeout, sharing the same session
+    _client   = None
+    _clients  = {}
+
+    # Shared fan-out thread pool and the process that created it
+    _pool     = None
+    _pool_pid = None
+    _pool_mux = Lock()
+
+    @classmethod
+    def client(cls, consistency='default', max_stale=MAX_STALE, timeout=None):
+        """
+        Return the shared Consul API client for a consistency mode (default, stale or
+        consistent), creating it on first use. Stale reads lagging the leader by more
+        than max_stale milliseconds (see the 'maxStale' configuration key) are retried.
+        Requests fail after timeout seconds if set.
+        """
+        if not cls._client:
+            cls._client   = PowerConsul_Consul()
+            cls._clients  = {('default', MAX_STALE, None): cls._client}
+
+        # Client for another consistency mode
+        key = (consistency, max_stale, timeout)
+        if not key in cls._clients:
+            client = PowerConsul_Consul(consistency=consistency, max_stale=max_stale, timeout=timeout)
+            client.http.session.close()
+            client.http.session = cls._client.http.session
+            cls._clients[key]   = client
+        return cls._clients[key]
+
+    @staticmethod
+    def last_contact():
+        """
+        Return the consistency of the last read made by this thread:
+        {'consistency': str, 'last_contact': <milliseconds>, 'known_leader': bool}.
+        """
+        return getattr(_LAST, 'contact', None)
+
+    @classmethod
+    def _pools(cls):
+        """
+        Return the connection pools of the shared client.
+        """
+        pools = []
+        if cls._client:
+            for adapter in cls._client.http.session.adapters.values():
+                for key in adapter.poolmanager.pools.keys():
+                    pools.append(adapter.poolmanager.pools[key])
+        return pools
+
+    @classmethod
+    def stats(cls):
+        """
+        Return the number of connections opened versus requests made by this process.
+        """
+        stats = {'connections': 0, 'requests': 0}
+        for pool in cls._pools():
+            stats['connections'] += pool.num_connections
+            stats['requests']    += pool.num_requests
+        return stats
+
+    @classmethod
+    def reset(cls):
+        """
+        Close pooled connections and reset the counters, i.e. after forking. The client
+        stays usable and opens new connections on the next request.
+        """
+        PowerConsul_Metrics.reset()
+        if cls._client:
+            cls._client.http.session.close()
+
+    @classmethod
+    def pool(cls):
+        """
+        Return the shared fan-out thread pool, created on first use. Threads do not
+        survive a fork, so a forked child creates its own pool.
+        """
+        with cls._pool_mux:
+            if not cls._pool or (cls._pool_pid != getpid()):
+                cls._pool     = ThreadPool(FANOUT_WORKERS)
+                cls._pool_pid = getpid()
+            return cls._pool
+
+    @classmethod
+    def fanout(cls, func, items):
+        """
+        Call a function for each item (i.e. datacenter) concurrently on the shared
+        thread pool. Returns a map of item -> {'result': <return value>, 'error': <str or None>}.
+        """
+        def _call(item):
+            active         = getattr(_WORKER, 'active', False)
+            _WORKER.active = True
+            try:
+                return item, {'result': func(item), 'error': None}
+            except Exception as e:
+                return item, {'result': None, 'error': str(e) or e.__class__.__name__}
+            finally:
+                _WORKER.active = active
+
+        # Nothing to run concurrently, or already on a pool worker
+        if (len(items) <= 1) or getattr(_WORKER, 'active', False):
+            return dict(_call(item) for item in items)
+        return dict(cls.pool().map(_call, items))
@@ -0,0 +1,125 @@
+import re
+from multiprocessing.pool import ThreadPool
+from powerconsul.api import PowerConsul_API, FANOUT_WORKERS
+
+# Check statuses from best to worst, anything else (i.e. maintenance) counts as critical
+STATUS_ORDER = ['passing', 'warning', 'critical']
+
+def worst_status(statuses):
+    """
+    Return the worst of a list of check statuses, critical if the list is empty.
+
+    :param statuses: The check statuses
+    :type  statuses: list
+    :rtype: str
+    """
+    worst = None
+    for status in statuses:
+        rank  = STATUS_ORDER.index(status) if status in STATUS_ORDER else len(STATUS_ORDER) - 1
+        worst = rank if worst is None else max(worst, rank)
+    return STATUS_ORDER[-1] if worst is None else STATUS_ORDER[worst]
+
+class PowerConsul_Health(object):
+    """
+    Service health collector. Queries datacenters concurrently and streams mapped
+    service records, so callers can stop as soon as they have an answer.
+    """
+    def __init__(self, service, datacenters=None, srvFilter=None, api=None):
+
+        # Consul service / datacenters (local datacenter if not set)
+        self.service     = service
+        self.datacenters = datacenters or [None]
+
+        # Node filter, compiled once
+        self.filter      = None if not srvFilter else re.compile(srvFilter)
+
+        # Consul API client, stale reads by default
+        self.api         = api or PowerConsul_API.client('stale')
+
+        # Nodes skipped by the filter
+        self.skipped     = []
+
+    def _query(self, dc):
+        """
+        Query service health in a single datacenter.
+        """
+        return dc, self.api.health.service(self.service, dc=dc)[1]
+
+    def _query_node(self, target):
+        """
+        Query the health checks of a single node in a single datacenter.
+        """
+        node, dc = target
+        return node, dc, self.api.health.node(node, dc=dc)[1]
+
+    def _status(self, checks):
+        """
+        Return the worst status of the service checks, critical if there are none.
+        """
+        return worst_status([check['Status'] for check in checks if check.get('ServiceName') == self.service])
+
+    def _map(self, dc, services):
+        """
+        Map raw service health entries to {node, status, dc} records.
+        """
+        for srv in services:
+            node = srv['Node']['Node']
+
+            # Service regex filter
+            if self.filter and not self.filter.match(node):
+                self.skipped.append(node)
+                continue
+
+            # Map the service check status
+            yield {'node': node, 'status': self._status(srv['Checks']), 'dc': dc}
+
+    def __iter__(self):
+        """
+        Stream records as each datacenter responds. Requests still in flight when the
+        caller stops are discarded.
+        """
+        if len(self.datacenters) == 1:
+            for record in self._map(*self._query(self.datacenters[0])):
+                yield record
+            return
+
+        # Query all datacenters concurrently
+        pool = ThreadPool(min(FANOUT_WORKERS, len(self.datacenters)))
+        try:
+            for dc, services in pool.imap_unordered(self._query, self.datacenters):
+                for record in self._map(dc, services):
+                    yield record
+        finally:
+            pool.terminate()
+
+    def nodes(self, nodes):
+        """
+        Stream records for the listed nodes only, querying each node in each datacenter
+        concurrently instead of listing every instance of the service. Nodes without the
+        service in a datacenter are skipped, and iteration ends once every node has been
+        found.
+        """
+        matched = []
+        for node in nodes:
+
+            # Service regex filter
+            if self.filter and not self.filter.match(node):
+                self.skipped.append(node)
+                continue
+            matched.append(node)
+        targets = [(node, dc) for dc in self.datacenters for node in matched]
+
+        # Query all nodes and datacenters concurrently, submitted nearest datacenter first, results streamed as they arrive
+        pool    = ThreadPool(min(FANOUT_WORKERS, len(targets) or 1))
+        pending = set(node for node, dc in targets)
+        try:
+            for node, dc, checks in pool.imap_unordered(self._query_node, targets):
+                if any(check.get('ServiceName') == self.service for check in checks):
+                    pending.discard(node)
+                    yield {'node': node, 'status': self._status(checks), 'dc': dc}
+
+                # Every node has answered, skip the remaining datacenters
+                if not pending:
+                    break
+        finally:
+            pool.terminate()
@@ -0,0 +1,170 @@
+import os
+import fcntl
+import marshal
+from threading import Lock
+from tempfile import mkstemp
+
+# Request latency histogram buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class PowerConsul_Metrics(object):
+    """
+    Consul API call instrumentation for the current process. Calls can be summarised
+    for the check log and merged into a node_exporter textfile shared by all Power
+    Consul processes on the host.
+    """
+
+    # Calls made by this process: (method, endpoint, dc, status, bytes, seconds) / calls exported
+    _calls    = []
+    _exported = 0
+    _lock     = Lock()
+
+    @staticmethod
+    def endpoint(path):
+        """
+        Return the endpoint of an API path without keys or names, i.e. /v1/kv or
+        /v1/health/service.
+        """
+        parts = path.split('/')
+        return '/'.join(parts[:3] if (len(parts) > 2 and parts[2] == 'kv') else parts[:4])
+
+    @classmethod
+    def record(cls, method, path, params, status, nbytes, seconds):
+        """
+        Record a single API call.
+        """
+        dc = dict(params or []).get('dc') or 'local'
+        with cls._lock:
+            cls._calls.append((method.upper(), cls.endpoint(path), dc, str(status), nbytes, seconds))
+
+    @classmethod
+    def reset(cls):
+        """
+        Forget all recorded calls, i.e. after forking.
+        """
+        with cls._lock:
+            del cls._calls[:]
+            cls._exported = 0
+
+    @classmethod
+    def count(cls):
+        """
+        Return the number of calls recorded by this process.
+        """
+        return len(cls._calls)
+
+    @classmethod
+    def since(cls, offset):
+        """
+        Return the number of calls and seconds spent in them after the given call count.
+        """
+        with cls._lock:
+            calls = cls._calls[offset:]
+        return len(calls), sum(c[5] for c in calls)
+
+    @classmethod
+    def summary(cls):
+        """
+        Summarise the calls made by this process.
+        """
+        with cls._lock:
+            calls = list(cls._calls)
+        slowest = None if not calls else max(calls, key=lambda c: c[5])
+        return {
+            'calls': len(calls),
+            'errors': len([c for c in calls if (c[3] == 'error') or c[3].startswith('5')]),
+            'bytes': sum(c[4] for c in calls),
+            'seconds': sum(c[5] for c in calls),
+            'slowest': None if not slowest else '{0} {1}@{2}:{3}ms'.format(slowest[0], slowest[1], slowest[2], int(slowest[5] * 1000))
+        }
+
+    @staticmethod
+    def _merge(state, calls):
+        """
+        Add calls to the aggregated host state.
+        """
+        for method, endpoint, dc, status, nbytes, seconds in calls:
+            key = (endpoint, dc)
+            state['requests'][(method, endpoint, dc, status)] = state['requests'].get((method, endpoint, dc, status), 0) + 1
+            state['bytes'][key] = state['bytes'].get(key, 0) + nbytes
+
+            # Latency histogram: cumulative bucket counts, sum, count
+            histogram = state['latency'].setdefault(key, [0] * len(LATENCY_BUCKETS) + [0.0, 0])
+            for i, bucket in enumerate(LATENCY_BUCKETS):
+                if seconds <= bucket:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+        return state
+
+    @staticmethod
+    def _render(state):
+        """
+        Render the aggregated host state in the Prometheus text format.
+        """
+        lines = [
+            '# HELP powerconsul_api_requests_total Consul API requests made by Power Consul.',
+            '# TYPE powerconsul_api_requests_total counter'
+        ]
+        for (method, endpoint, dc, status), count in sorted(state['requests'].iteritems()):
+            lines.append('powerconsul_api_requests_total{{method="{0}",endpoint="{1}",dc="{2}",status="{3}"}} {4}'.format(method, endpoint, dc, status, count))
+
+        # Response bytes
+        lines.extend([
+            '# HELP powerconsul_api_response_bytes_total Consul API response bytes received by Power Consul.',
+            '# TYPE powerconsul_api_response_bytes_total counter'
+        ])
+        for (endpoint, dc), nbytes in sorted(state['bytes'].iteritems()):
+            lines.append('powerconsul_api_response_bytes_total{{endpoint="{0}",dc="{1}"}} {2}'.format(endpoint, dc, nbytes))
+
+        # Request latency
+        lines.extend([
+            '# HELP powerconsul_api_request_duration_seconds Consul API request latency.',
+            '# TYPE powerconsul_api_request_duration_seconds histogram'
+        ])
+        for (endpoint, dc), histogram in sorted(state['latency'].iteritems()):
+            labels = 'endpoint="{0}",dc="{1}"'.format(endpoint, dc)
+            for i, bucket in enumerate(LATENCY_BUCKETS):
+                lines.append('powerconsul_api_request_duration_seconds_bucket{{{0},le="{1}"}} {2}'.format(labels, bucket, histogram[i]))
+            lines.append('powerconsul_api_request_duration_seconds_bucket{{{0},le="+Inf"}} {1}'.format(labels, histogram[-1]))
+            lines.append('powerconsul_api_request_duration_seconds_sum{{{0}}} {1}'.format(labels, histogram[-2]))
+            lines.append('powerconsul_api_request_duration_seconds_count{{{0}}} {1}'.format(labels, histogram[-1]))
+        return '\n'.join(lines) + '\n'
+
+    @classmethod
+    def export(cls, path):
+        """
+        Merge the calls made by this process into a node_exporter textfile. The
+        aggregated counters are kept next to it in <path>.state, and concurrent
+        processes are serialised with an flock on <path>.lock. Exporting is best effort,
+        returns False if the textfile could not be written.
+        """
+        try:
+            with open('{0}.lock'.format(path), 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+
+                # Aggregated host state
+                try:
+                    with open('{0}.state'.format(path), 'rb') as f:
+                        state = marshal.load(f)
+                except Exception:
+                    state = {'requests': {}, 'bytes': {}, 'latency': {}}
+
+                # Calls made since the last export
+                with cls._lock:
+                    calls = cls._calls[cls._exported:]
+                state = cls._merge(state, calls)
+
+                # Write the state and textfile, then move them into place
+                for target, data, mode in [('{0}.state'.format(path), marshal.dumps(state), 'wb'), (path, cls._render(state), 'w')]:
+                    fd, tmp = mkstemp(dir=os.path.dirname(path) or '.', prefix='.powerconsul.')
+                    with os.fdopen(fd, mode) as f:
+                        f.write(data)
+                    os.chmod(tmp, 0644)
+                    os.rename(tmp, target)
+            cls._exported += len(calls)
+            return True
+
+        # Failed to export metrics
+        except Exception:
+            return False
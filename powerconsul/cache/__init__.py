@@ -0,0 +1,115 @@
+import os
+import errno
+import fcntl
+import marshal
+from time import time, sleep
+from tempfile import mkstemp
+from contextlib import contextmanager
+
+# Host-wide cache directory shared by all Power Consul processes
+CACHE_DIR  = '/var/run/powerconsul/cache'
+
+# Seconds between attempts to take a cache lock with a timeout
+LOCK_POLL  = 0.05
+
+class PowerConsul_Cache(object):
+    """
+    Host-wide on-disk cache. Entries are marshalled to a temporary file and renamed
+    into place, so concurrent readers always see a complete entry.
+    """
+    @staticmethod
+    def path(name):
+        """
+        Return the file path for a cache entry.
+        """
+        return os.path.join(CACHE_DIR, name)
+
+    @classmethod
+    def load(cls, name, ttl=None):
+        """
+        Load a cache entry. Returns None if the entry is missing, unreadable or older
+        than the TTL in seconds.
+        """
+        try:
+            with open(cls.path(name), 'rb') as f:
+                entry = marshal.load(f)
+        except Exception:
+            return None
+
+        # Entry has expired
+        if (ttl is not None) and ((time() - entry['created']) > ttl):
+            return None
+        return entry['data']
+
+    @classmethod
+    def dump(cls, name, data):
+        """
+        Atomically write a cache entry. Caching is best effort, returns False if the
+        entry could not be written.
+        """
+        tmp = None
+        try:
+            if not os.path.isdir(CACHE_DIR):
+                os.makedirs(CACHE_DIR, 0755)
+
+            # Write to a temporary file and move into place
+            fd, tmp = mkstemp(dir=CACHE_DIR, prefix='.{0}.'.format(name))
+            with os.fdopen(fd, 'wb') as f:
+                marshal.dump({'created': time(), 'data': data}, f)
+            os.rename(tmp, cls.path(name))
+            return True
+
+        # Failed to write the cache entry
+        except Exception:
+            if tmp and os.path.isfile(tmp):
+                os.unlink(tmp)
+            return False
+
+    @classmethod
+    @contextmanager
+    def lock(cls, name, timeout=None):
+        """
+        Hold an exclusive lock for a cache entry, so only one process on the host
+        refreshes it at a time. Yields False without locking if the lock file cannot
+        be opened, or if the lock is still held by another process after timeout seconds.
+        """
+        try:
+            if not os.path.isdir(CACHE_DIR):
+                os.makedirs(CACHE_DIR, 0755)
+            f = open(cls.path('.{0}.lock'.format(name)), 'a')
+        except Exception:
+            yield False
+            return
+
+        # Wait for any other writer
+        locked = False
+        try:
+            locked = cls._flock(f, timeout)
+            yield locked
+        finally:
+            if locked:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+    @staticmethod
+    def _flock(f, timeout=None):
+        """
+        Take an exclusive lock on an open file, polling until timeout seconds have passed
+        if set. Returns False if the lock could not be taken in time.
+        """
+        if timeout is None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            return True
+
+        # Poll until the deadline
+        deadline = time() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except IOError as e:
+                if e.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+                if time() >= deadline:
+                    return False
+            sleep(LOCK_POLL)
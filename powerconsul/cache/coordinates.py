@@ -0,0 +1,72 @@
+from math import sqrt
+from powerconsul.cache import PowerConsul_Cache
+
+# Default seconds before cached datacenter round trip times are refreshed
+COORDINATES_TTL = 300
+
+def distance(a, b):
+    """
+    Estimated round trip time in seconds between two Vivaldi network coordinates.
+    """
+    rtt      = sqrt(sum((x - y) ** 2 for x, y in zip(a['Vec'], b['Vec']))) + a['Height'] + b['Height']
+    adjusted = rtt + a['Adjustment'] + b['Adjustment']
+    return adjusted if adjusted > 0 else rtt
+
+def median(values):
+    """
+    Return the median of a list of values.
+    """
+    values = sorted(values)
+    return values[len(values) // 2]
+
+class PowerConsul_Coordinates(object):
+    """
+    Datacenter round trip times from the Consul WAN network coordinates, cached for the
+    process and on disk for the host.
+    """
+
+    # Cache TTL in seconds
+    ttl      = COORDINATES_TTL
+
+    # Round trip times already loaded by this process: local datacenter -> {dc: seconds}
+    _loaded  = {}
+
+    @classmethod
+    def rtts(cls, api, local):
+        """
+        Return the median round trip time in seconds from the servers of the local
+        datacenter to the servers of every datacenter.
+        """
+        if local in cls._loaded:
+            return cls._loaded[local]
+
+        # Host-wide cache
+        name = 'coordinates_{0}'.format(local)
+        rtts = PowerConsul_Cache.load(name, ttl=cls.ttl)
+        if rtts is None:
+            servers = dict((dc['Datacenter'], [c['Coord'] for c in dc['Coordinates']]) for dc in api.coordinate.datacenters())
+            rtts    = {}
+
+            # Median distance between local and remote servers
+            if servers.get(local):
+                for dc, coords in servers.iteritems():
+                    if coords:
+                        rtts[dc] = 0.0 if dc == local else median([distance(a, b) for a in servers[local] for b in coords])
+            PowerConsul_Cache.dump(name, rtts)
+        cls._loaded[local] = rtts
+        return rtts
+
+    @classmethod
+    def order(cls, api, dcs, local):
+        """
+        Return datacenters ordered nearest first. Datacenters without coordinates are
+        kept last in their original order, and the order is unchanged if coordinates are
+        not available.
+        """
+        if not local or len(dcs) < 2:
+            return dcs
+        try:
+            rtts = cls.rtts(api, local)
+        except Exception:
+            return dcs
+        return sorted(dcs, key=lambda dc: (dc not in rtts, rtts.get(dc)))
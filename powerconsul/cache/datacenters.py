@@ -0,0 +1,50 @@
+from powerconsul.cache import PowerConsul_Cache
+
+# Default seconds before the cached datacenter list is refreshed
+DATACENTERS_TTL = 3600
+
+class PowerConsul_Datacenters(object):
+    """
+    Consul datacenter catalog, cached for the process and on disk for the host.
+    """
+
+    # Datacenters / local datacenter already loaded by this process
+    _loaded  = None
+    _local   = None
+
+    @classmethod
+    def get(cls, api, refresh=False, ttl=DATACENTERS_TTL):
+        """
+        Return all Consul datacenters, only querying the catalog if the cache is
+        missing, older than ttl seconds (see the 'datacenterTTL' configuration key) or
+        a refresh is forced.
+        """
+        if not refresh:
+            if cls._loaded is not None:
+                return cls._loaded
+
+            # Host-wide cache
+            dcs = PowerConsul_Cache.load('datacenters', ttl=ttl)
+            if dcs:
+                cls._loaded = dcs
+                return dcs
+
+        # Query the catalog and update the cache
+        cls._loaded = api.catalog.datacenters()
+        PowerConsul_Cache.dump('datacenters', cls._loaded)
+        return cls._loaded
+
+    @classmethod
+    def local(cls, api, ttl=DATACENTERS_TTL):
+        """
+        Return the datacenter of the local Consul agent, only querying the agent if the
+        cache is missing or older than ttl seconds.
+        """
+        if cls._local is None:
+            cls._local = PowerConsul_Cache.load('datacenter_local', ttl=ttl)
+
+            # Query the agent and update the cache
+            if not cls._local:
+                cls._local = api.agent.self()['Config']['Datacenter']
+                PowerConsul_Cache.dump('datacenter_local', cls._local)
+        return cls._local
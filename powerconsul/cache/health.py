@@ -0,0 +1,40 @@
+from powerconsul.cache import PowerConsul_Cache
+
+# Seconds a refresh may take: Consul request timeout, and how long other processes wait
+# for the refresher before querying Consul themselves
+HEALTH_REFRESH_TIMEOUT = 10
+
+class PowerConsul_HealthCache(object):
+    """
+    Host-wide service health snapshots, so concurrent checks that need the same view
+    share one set of API calls.
+    """
+    @staticmethod
+    def name(service, datacenters=None):
+        """
+        Return the cache entry name for a service and datacenters.
+        """
+        return 'health_{0}_{1}'.format(service, ','.join(sorted(datacenters)) if datacenters else 'local')
+
+    @classmethod
+    def get(cls, service, datacenters, collect, ttl):
+        """
+        Return service health records from the host cache. If the snapshot is older than
+        ttl seconds (see the 'healthCacheTTL' configuration key) or missing, one process
+        refreshes it with collect() while others wait and then read the refreshed snapshot.
+        Processes still waiting after HEALTH_REFRESH_TIMEOUT seconds call collect() themselves.
+        """
+        name    = cls.name(service, datacenters)
+        records = PowerConsul_Cache.load(name, ttl=ttl)
+        if records is not None:
+            return records
+
+        # Single writer
+        with PowerConsul_Cache.lock(name, timeout=HEALTH_REFRESH_TIMEOUT) as locked:
+
+            # Refreshed by another process while waiting
+            records = None if not locked else PowerConsul_Cache.load(name, ttl=ttl)
+            if records is None:
+                records = list(collect())
+                PowerConsul_Cache.dump(name, records)
+        return records
@@ -1,20 +1,23 @@
 import __builtin__
-import re
 import json
 from os import geteuid
-from consul import Consul
 from socket import gethostname
 from traceback import print_exc
 from importlib import import_module
 from sys import stderr, exit, stdout
 
 # Power Consul modules
+from powerconsul.api import PowerConsul_API
+from powerconsul.api.health import PowerConsul_Health
+from powerconsul.cache.health import PowerConsul_HealthCache, HEALTH_REFRESH_TIMEOUT
+from powerconsul.cache.coordinates import PowerConsul_Coordinates
 from powerconsul.kvdb import PowerConsul_KVDB
 from powerconsul.common.output import PowerConsul_Output
 from powerconsul.common.collection import PowerConsul_Collection
 from powerconsul.common.action import PowerConsul_Action
 from powerconsul.common.cluster import PowerConsul_Cluster
 from powerconsul.common.config import PowerConsul_Config
+from powerconsul.common.trace import PowerConsul_Trace
 
 class PowerConsulCommon(object):
     """
@@ -26,9 +29,8 @@ class PowerConsulCommon(object):
         self.HANDLERS    = None
         self.ARGS        = None
 
-        # Consul API / KV database / configuration
-        self.API         = Consul()
-        self.KV          = PowerConsul_KVDB(put_local=False)
+        # KV database (created on first use) / configuration
+        self._kv         = None
         self.CONFIG      = PowerConsul_Config
 
         # Store the host name
@@ -40,19 +42,57 @@ class PowerConsulCommon(object):
         # Logger
         self.LOG         = None
 
-        # Output / collection generators / action handler / cluster object
+        # Output / collection generators / action handler / cluster object / tracing
         self.OUTPUT      = PowerConsul_Output
         self.COLLECTION  = PowerConsul_Collection
         self.ACTION      = PowerConsul_Action
         self.CLUSTER     = PowerConsul_Cluster
+        self.TRACE       = PowerConsul_Trace
 
-        # Consul attribute shortcuts
-        self.datacenters = self.API.catalog.datacenters()
+    @property
+    def API(self):
+        """
+        Shared Consul API client.
+        """
+        return PowerConsul_API.client()
+
+    @property
+    def API_STALE(self):
+        """
+        Shared Consul API client for stale reads, served by any server.
+        """
+        return PowerConsul_API.client('stale', self.CONFIG.maxStale)
+
+    @property
+    def API_CONSISTENT(self):
+        """
+        Shared Consul API client for consistent reads, confirmed by the leader.
+        """
+        return PowerConsul_API.client('consistent')
+
+    @property
+    def KV(self):
+        """
+        KV database for all datacenters, sharing the Consul API client.
+        """
+        if not self._kv:
+            self._kv = PowerConsul_KVDB(put_local=False, api=self.API, datacenter_ttl=self.CONFIG.datacenterTTL)
+        return self._kv
+
+    @property
+    def datacenters(self):
+        """
+        All Consul datacenters, retrieved on first use.
+        """
+        return self.KV.dcs
 
     def getKV(self, key, default=None):
         """
-        Perform a key/value lookup.
+        Perform a key/value lookup, reading through any loaded KV snapshot.
         """
+        hit, entry = self.KV.cached(key)
+        if hit:
+            return default if not entry else entry['raw']
         index, data = self.API.kv.get(key)
 
         # Return any value if found or default
@@ -67,7 +107,8 @@ class PowerConsulCommon(object):
 
             # Post to all datacenters
             if all_dcs:
-                self.KV.put(key, data)
+                self.KV.check(self.KV.put(key, data))
+                POWERCONSUL.LOG.info('Updated KV data in all datacenters for "{0}" -> {1}'.format(key, str(data)))
 
             # Local datacenter only
             else:
@@ -79,44 +120,42 @@ class PowerConsulCommon(object):
 
     def getServiceHealth(self, **kwargs):
         """
-        Get service health from Consul API.
+        Stream service health records ({node, status, dc}) from the Consul API. Datacenters
+        are queried concurrently, stop iterating once you have an answer. If the health
+        cache is enabled, records are read from the host-wide snapshot. Otherwise, if
+        nodes are given, only those nodes are queried.
         """
-        services    = []
         service     = kwargs.get('service', self.service)
         datacenters = kwargs.get('datacenters')
+        nodes       = kwargs.get('nodes')
         srvFilter   = POWERCONSUL.CONFIG.get('local', 'serviceFilter')
+        cacheTTL    = POWERCONSUL.CONFIG.healthCacheTTL
 
-        # Generate a list of Consul services from the API
+        # Query the nearest datacenters first
         if datacenters:
-            for dc in datacenters:
-                services = services + self.API.health.service(service, dc=dc)[1]
-        else:
-            services = self.API.health.service(service)[1]
-
-        # Mapped services
-        mappedServices = []
+            datacenters = PowerConsul_Coordinates.order(self.API_STALE, datacenters, POWERCONSUL.CONFIG.get('consul', 'datacenter'))
 
-        # Process raw services
-        for srv in services:
-            node   = srv['Node']['Node']
-            checks = srv['Checks'][1]
+        # Other checks wait on a cache refresh, so bound its requests
+        api         = self.API_STALE if not cacheTTL else PowerConsul_API.client('stale', self.CONFIG.maxStale, timeout=HEALTH_REFRESH_TIMEOUT)
+        health      = PowerConsul_Health(service, datacenters, srvFilter, api=api)
 
-            # Service regex filter
-            if srvFilter and not re.compile(srvFilter).match(node):
-                POWERCONSUL.LOG.debug('skip -> {0} != \'{1}\''.format(node, srvFilter), method='getServiceHealth')
-                continue
-
-            # Map the service
-            mappedServices.append({
-                'node': node,
-                'status': checks['Status']
-            })
+        # Shared snapshot for all checks on the host / listed nodes / all service nodes
+        if cacheTTL:
+            services = PowerConsul_HealthCache.get(service, datacenters, lambda: health, cacheTTL)
+        elif nodes:
+            services = health.nodes(nodes)
+        else:
+            services = health
 
-        # Log service map
-        POWERCONSUL.LOG.info('mappedServices={0}'.format(json.dumps(mappedServices)), method='getServiceHealth')
+        try:
+            for service in services:
+                POWERCONSUL.LOG.info('mappedService={0}'.format(json.dumps(service)), method='getServiceHealth')
+                yield service
 
-        # Return mapped services
-        return mappedServices
+        # Log filtered nodes
+        finally:
+            for node in health.skipped:
+                POWERCONSUL.LOG.debug('skip -> {0} != \'{1}\''.format(node, srvFilter), method='getServiceHealth')
 
     def parseJSON(self, data, error='Failed to parse JSON'):
         """
@@ -1,8 +1,18 @@
 import os
 import stat
 import json
+from time import time
 from uuid import uuid4
+from hashlib import sha1
+from tempfile import mkstemp
 from subprocess import Popen, PIPE
+from powerconsul.cache import PowerConsul_Cache
+
+# Rendered trigger scripts, readable by root only
+SCRIPT_CACHE   = '/var/run/powerconsul/triggers'
+
+# Remove rendered scripts not used for this many seconds
+SCRIPT_MAX_AGE = 7 * 86400
 
 class PowerConsul_Action(object):
     """
@@ -14,8 +24,9 @@ class PowerConsul_Action(object):
         self._type    = None
         self._state   = state
 
-        # Temporary script
+        # Script path / script is cached and kept after running
         self._script  = None
+        self._cached  = False
 
         # Bootstrap the action object
         self._bootstrap()
@@ -28,6 +39,73 @@ class PowerConsul_Action(object):
             cmdStr = cmdStr.replace('@{0}'.format(k), v)
         return cmdStr
 
+    def _script_path(self):
+        """
+        Return the cache path for the rendered script, keyed by the script content and
+        the substitution variables.
+        """
+        subVars = dict(POWERCONSUL.CONFIG.get('local', 'subVars', default={}).__dict__)
+        return os.path.join(SCRIPT_CACHE, 'trigger_{0}_{1}.sh'.format(
+            sha1(self._data if isinstance(self._data, str) else self._data.encode('utf-8')).hexdigest(),
+            sha1(json.dumps(subVars, sort_keys=True)).hexdigest()
+        ))
+
+    def _dump_script(self):
+        """
+        Render the script into the root-only cache, or a temporary file if the cache is
+        not writable. Cached scripts are only written once.
+        """
+        try:
+            if not os.path.isdir(SCRIPT_CACHE):
+                os.makedirs(SCRIPT_CACHE, 0700)
+            self._script = self._script_path()
+
+            # Already rendered, mark as recently used
+            try:
+                os.utime(self._script, None)
+                self._cached = True
+                return None
+            except OSError:
+                pass
+
+            # Write to a temporary file and move into place
+            fd, tmp = mkstemp(dir=SCRIPT_CACHE, prefix='.trigger_')
+            with os.fdopen(fd, 'w') as f:
+                f.write(self._subvars(self._data))
+                f.write('\n')
+            os.chmod(tmp, 0700)
+            os.rename(tmp, self._script)
+            self._cached = True
+
+            # Scripts left behind by edited triggers or substitution variables
+            self._prune_scripts()
+            return None
+
+        # Script cache not available
+        except (IOError, OSError):
+            self._script = '/tmp/trigger_{0}.sh'.format(str(uuid4()))
+
+        # Dump the action script
+        with open(self._script, 'w') as f:
+            for line in self._data.split('\n'):
+                f.write(self._subvars(line))
+                f.write('\n')
+        os.chmod(self._script, os.stat(self._script).st_mode | stat.S_IEXEC)
+
+    def _prune_scripts(self):
+        """
+        Remove cached scripts and leftover temporary files that have not been used for
+        SCRIPT_MAX_AGE seconds.
+        """
+        expires = time() - SCRIPT_MAX_AGE
+        for name in os.listdir(SCRIPT_CACHE):
+            path = os.path.join(SCRIPT_CACHE, name)
+            try:
+                if name.startswith(('trigger_', '.trigger_')) and (os.stat(path).st_mtime < expires):
+                    os.remove(path)
+            except OSError:
+                pass
+
     def _bootstrap(self):
         """
         Bootstrap the action object.
@@ -40,15 +118,8 @@ class PowerConsul_Action(object):
         if self._data.startswith('#!/bin/bash'):
             self._type   = 'script'
 
-            # Define a temporary script
-            self._script = '/tmp/trigger_{0}.sh'.format(str(uuid4()))
-
-            # Dump the action script
-            with open(self._script, 'w') as f:
-                for line in self._data.split('\n'):
-                    f.write(self._subvars(line))
-                    f.write('\n')
-            os.chmod(self._script, os.stat(self._script).st_mode | stat.S_IEXEC)
+            # Render the action script
+            self._dump_script()
 
             # Define the command
             self._command = ['/bin/bash', self._script]
@@ -60,9 +131,9 @@ class PowerConsul_Action(object):
 
     def _cleanup(self):
         """
-        Post action cleanup.
+        Post action cleanup. Cached scripts are kept for the next run.
         """
-        if os.path.isfile(self._script):
+        if self._script and not self._cached and os.path.isfile(self._script):
             os.remove(self._script)
 
     def run(self):
@@ -120,6 +191,30 @@ class PowerConsul_Action(object):
             POWERCONSUL.LOG.info('No active/healthy datacenters, set role: primary', method='action.checkDatacenters')
             POWERCONSUL.CLUSTER.role = POWERCONSUL.CLUSTER.roles.primary
 
+    @classmethod
+    def triggers(cls):
+        """
+        Return all trigger definitions for the service (key -> raw value), loaded with
+        one recursive read. If the 'triggerCacheTTL' configuration key is set, the
+        definitions are cached on the host for that many seconds.
+        """
+        name = 'triggers_{0}'.format(POWERCONSUL.service)
+        ttl  = POWERCONSUL.CONFIG.get('local', 'triggerCacheTTL', default=0)
+
+        # Host cache
+        if ttl:
+            triggers = PowerConsul_Cache.load(name, ttl=ttl)
+            if triggers is not None:
+                POWERCONSUL.LOG.info('Loaded cached trigger definitions: {0}'.format(name), method='action.triggers')
+                return triggers
+
+        # Load all triggers for the service
+        keys     = POWERCONSUL.KV.snapshot('triggers/{0}/'.format(POWERCONSUL.service))['local']
+        triggers = dict((key, entry['raw']) for key, entry in keys.iteritems())
+        if ttl:
+            PowerConsul_Cache.dump(name, triggers)
+        return triggers
+
     @classmethod
     def parse(cls, state):
         """
@@ -150,7 +245,7 @@ class PowerConsul_Action(object):
                 cls.checkNodes()
 
             # Return the action object
-            return cls(POWERCONSUL.getKV('triggers/{0}/{1}/{2}'.format(
+            return cls(cls.triggers().get('triggers/{0}/{1}/{2}'.format(
                 POWERCONSUL.service, POWERCONSUL.CLUSTER.role, state
             )), state)
 
@@ -16,8 +16,8 @@ def get_base_commands():
     commands = {
         "help": "Get help for a specific command: powerconsul help <command>"
     }
-    for handler, cls in PowerConsulHandlers().all().iteritems():
-        commands[handler] = cls.desc['summary']
+    for handler, summary in PowerConsulHandlers().summaries().iteritems():
+        commands[handler] = summary
     return commands
 
 class PowerConsulArgs_Base(object):
@@ -192,7 +192,7 @@ class PowerConsulArgs(object):
         """
         Return a list of supported handlers.
         """
-        return [h for h in POWERCONSUL.HANDLERS.all().keys()]
+        return POWERCONSUL.HANDLERS.names()
 
     @classmethod
     def construct(cls, desc=PowerConsulArgs_Base.desc, opts=PowerConsulArgs_Base.options, cmds=PowerConsulArgs_Base.commands, base=True):
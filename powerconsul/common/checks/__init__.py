@@ -4,6 +4,7 @@ from os import path
 from subprocess import Popen, PIPE
 
 import powerconsul.common.logger as logger
+from powerconsul.common.trace import PowerConsul_Trace
 
 class Check_Base(object):
     """
@@ -22,6 +23,7 @@ class Check_Base(object):
 
         # Parse the Consul service name and bootstrap cluster status
         POWERCONSUL.service = POWERCONSUL.ARGS.get('consulservice', required='Must supply a Consul servicename: powerconsul check <resource> -S <serviceName>')
+        POWERCONSUL.TRACE.tag(service=POWERCONSUL.service)
 
         # Setup the logger
         POWERCONSUL.LOG = logger.create('check', service=POWERCONSUL.service, log_file='/var/log/powerconsul/check/{0}.{1}.log'.format(self.resource, POWERCONSUL.service))
@@ -30,6 +32,14 @@ class Check_Base(object):
         # Bootstrap the cluster
         POWERCONSUL.CLUSTER.bootstrap()
 
+    def probe(self, check, *args, **kwargs):
+        """
+        Run a local resource probe (service status, Nagios script, crontab) in a trace span.
+        """
+        with POWERCONSUL.TRACE.span('check.probe', resource=self.resource, probe=check.__name__) as span:
+            span['result'] = check(*args, **kwargs)
+        return span['result']
+
     def checkNoop(self):
         """
         Look for the existence of a noop file, to indicate all checks should pass.
@@ -58,7 +68,7 @@ class Check_Base(object):
         Swap the secondary servers to primary in cluster KV data in the event
         of a primary failure.
         """
-        data = POWERCONSUL.CLUSTER.data.getAll()
+        data = POWERCONSUL.CLUSTER.data.current() or POWERCONSUL.CLUSTER.data.getAll()
 
         # Cluster data is locked
         if 'lock' in data and data['lock']:
@@ -139,10 +149,12 @@ class Check_Base(object):
                     return True
         return False
 
+    @PowerConsul_Trace.traced('setDNS')
     def setDNS(self, state):
         """
         Disable/enable this service in a DNS prepared query via tags.
         """
+        POWERCONSUL.TRACE.annotate(enabled=state)
         try:
             serviceObj   = POWERCONSUL.API.agent.services()[POWERCONSUL.service]
             applyChanges = False
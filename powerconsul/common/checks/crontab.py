@@ -75,7 +75,7 @@ class Check_Crontab(Check_Base):
         """
         Ensure a specific crontab state.
         """
-        enabled = self.enabled()
+        enabled = self.probe(self.enabled)
 
         # Crontab should be enabled
         if expects == True:
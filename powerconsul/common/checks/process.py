@@ -50,7 +50,7 @@ class Check_Process(Check_Base):
         """
         Ensure a specific service state.
         """
-        code, output = self.checkNagios()
+        code, output = self.probe(self.checkNagios)
 
         # Process should be running/healthy
         if expects == True:
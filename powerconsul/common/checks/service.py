@@ -41,7 +41,7 @@ class Check_Service(Check_Base):
         """
         Ensure a specific service state.
         """
-        running  = self.running(expects=expects)
+        running  = self.probe(self.running, expects=expects)
 
         # Service should be running
         if expects == True:
@@ -56,7 +56,7 @@ class Check_ServiceGroup(Check_Base):
         """
         Ensure a specific service state.
         """
-        running  = self.running(expects)
+        running  = self.probe(self.running, expects)
 
         # Service should be running
         if expects == True:
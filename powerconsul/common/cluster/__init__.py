@@ -1,6 +1,7 @@
 import re
 import json
 
+from powerconsul.common.trace import PowerConsul_Trace
 from powerconsul.common.cluster.data import PowerConsul_ClusterData
 
 class PowerConsul_Cluster(object):
@@ -75,6 +76,7 @@ class PowerConsul_Cluster(object):
         # Return the datacenters collection
         return self._setGroup(datacenters, 'datacenters')
 
+    @PowerConsul_Trace.traced('cluster._process')
     def _process(self, clusterAttrs):
         """
         Process cluster data.
@@ -167,13 +169,10 @@ class PowerConsul_Cluster(object):
 
     def checkService(self, datacenters=None, nodes=None):
         """
-        Check the state of a Consul service.
+        Check the state of a Consul service. Yields a passing flag for each node as
+        service health is collected.
         """
-        statusList = []
-        services   = POWERCONSUL.getServiceHealth(datacenters=datacenters)
-
-        # Process services
-        for service in services:
+        for service in POWERCONSUL.getServiceHealth(datacenters=datacenters, nodes=nodes):
             node   = service['node']
             status = service['status']
 
@@ -181,12 +180,10 @@ class PowerConsul_Cluster(object):
             if nodes and not node in nodes:
                 continue
 
-            # Store the status for the node
-            statusList.append(self._checkStatus(node, status))
-
-        # Return the status list
-        return statusList
+            # Yield the status for the node
+            yield self._checkStatus(node, status)
 
+    @PowerConsul_Trace.traced('cluster.activePassing')
     def activePassing(self, datacenters=None, nodes=None):
         """
         Check if a Consul service has any active nodes in a passing state.
@@ -197,19 +194,13 @@ class PowerConsul_Cluster(object):
         if datacenters and nodes:
             POWERCONSUL.LOG.critical('Cannot check for active/passing services by datacenters/nodes at the same time!', method='cluster.activePassing', die=True)
 
-        # By datacenter
+        # By datacenter, stop at the first passing node
         if datacenters:
-            for status in self.checkService(datacenters=datacenters):
-                if anyPassing:
-                    continue
-                anyPassing = status
+            anyPassing = any(self.checkService(datacenters=datacenters))
 
-        # By nodes
+        # By nodes, stop at the first passing node
         if nodes:
-            for status in self.checkService(datacenters=self.datacenters.all, nodes=nodes):
-                if anyPassing:
-                    continue
-                anyPassing = status
+            anyPassing = any(self.checkService(datacenters=self.datacenters.all, nodes=nodes))
 
         # Log the results
         POWERCONSUL.LOG.info('by_nodes={0}, by_datacenters={1}, any_passing={2}, role={3}'.format(
@@ -218,6 +209,7 @@ class PowerConsul_Cluster(object):
             ('yes' if anyPassing else 'no'),
             self.role
         ), method='cluster.activePassing')
+        POWERCONSUL.TRACE.annotate(by_nodes=bool(nodes), by_datacenters=bool(datacenters), any_passing=anyPassing)
 
         # Return the flag that shows in any active services are passing
         return anyPassing
@@ -1,6 +1,8 @@
 import re
 import json
 from copy import copy
+from powerconsul.cache import PowerConsul_Cache
+from powerconsul.common.trace import PowerConsul_Trace
 
 class PowerConsul_ClusterData(object):
     """
@@ -26,6 +28,44 @@ class PowerConsul_ClusterData(object):
         """
         return self._alldata
 
+    def current(self):
+        """
+        Read all cluster data from the leader, bypassing any caches. Used for failover
+        decisions.
+        """
+        index, data = POWERCONSUL.API_CONSISTENT.kv.get('{0}/{1}'.format(self._clusterKey, POWERCONSUL.service))
+        return None if not data else POWERCONSUL.parseJSON(data['Value'], error='Failed to parse cluster data')
+
+    def _fetch(self, kvpath):
+        """
+        Return the modify index and raw value of the cluster data, reading through any
+        loaded KV snapshot.
+        """
+        hit, entry = POWERCONSUL.KV.cached(kvpath)
+        if hit:
+            return (None, None) if not entry else (entry['index'], entry['raw'])
+
+        # Read from Consul, stale reads are fine for routine checks
+        index, data = POWERCONSUL.API_STALE.kv.get(kvpath)
+        return (None, None) if not data else (data['ModifyIndex'], data['Value'])
+
+    def _cached(self, kvpath, index):
+        """
+        Load parsed cluster data from the host cache if the modify index is unchanged.
+        """
+        if not index:
+            return False
+        cache = PowerConsul_Cache.load('cluster_{0}'.format(POWERCONSUL.service))
+
+        # Cache missing or stale
+        if not cache or (cache['kvpath'], cache['host'], cache['index']) != (kvpath, POWERCONSUL.HOST, index):
+            return False
+        self._data    = cache['data']
+        self._alldata = cache['alldata']
+        POWERCONSUL.LOG.info('Cluster data unchanged: {0} (index={1})'.format(kvpath, index), method='cluster.data._bootstrap')
+        return True
+
+    @PowerConsul_Trace.traced('cluster.data._bootstrap')
     def _bootstrap(self):
         """
         Bootstrap node cluster data.
@@ -35,8 +75,8 @@ class PowerConsul_ClusterData(object):
             return False
 
         # Get key/value data
-        kvpath = '{0}/{1}'.format(self._clusterKey, POWERCONSUL.service)
-        kvdata = POWERCONSUL.getKV(kvpath)
+        kvpath        = '{0}/{1}'.format(self._clusterKey, POWERCONSUL.service)
+        index, kvdata = self._fetch(kvpath)
 
         # No cluster data found
         if not kvdata:
@@ -44,6 +84,10 @@ class PowerConsul_ClusterData(object):
             return None
         POWERCONSUL.LOG.info('Discovered cluster data: {0}'.format(kvpath), method='cluster.data._bootstrap')
 
+        # Parsed cluster data is unchanged since the last run
+        if self._cached(kvpath, index):
+            return True
+
         # Load cluster data
         self._data    = POWERCONSUL.parseJSON(kvdata, error='Failed to parse cluster data')
         self._alldata = copy(self._data)
@@ -69,4 +113,14 @@ class PowerConsul_ClusterData(object):
 
         # Log cluster data
         POWERCONSUL.LOG.info('data={0}'.format(json.dumps(self._data)), method='cluster.data._bootstrap')
+
+        # Cache the parsed cluster data for this host
+        if index:
+            PowerConsul_Cache.dump('cluster_{0}'.format(POWERCONSUL.service), {
+                'kvpath': kvpath,
+                'host': POWERCONSUL.HOST,
+                'index': index,
+                'data': self._data,
+                'alldata': self._alldata
+            })
         return True
@@ -1,8 +1,27 @@
 import re
-import json
 from collections import namedtuple
 from types import InstanceType, ClassType
 
+# Record classes by name and fields / generated record types
+_RECORDS      = {}
+_RECORD_TYPES = set()
+
+def record_class(name, fields):
+    """
+    Return a named tuple class for a set of fields, creating it only once per process.
+
+    :param name: The class name
+    :type name: str
+    :param fields: The record field names
+    :type fields: tuple
+    :rtype: namedtuple
+    """
+    key = (name, fields)
+    if not key in _RECORDS:
+        _RECORDS[key] = namedtuple(name, fields)
+        _RECORD_TYPES.add(_RECORDS[key])
+    return _RECORDS[key]
+
 def merge_dict(a, b, path=None):
         """
         Merge two dictionaries together. Do not overwrite duplicate keys.
@@ -96,14 +115,12 @@ class PowerConsul_Collection(object):
         if (type(obj) is InstanceType):
             return True
 
-        # Test for a class object
-        if (re.match(r'^<powerconsul\..[^>]*>$', str(obj))):
-            return True
+        # Collection records are data, not classes
+        if type(obj) in _RECORD_TYPES:
+            return False
 
-        # Test for a new style class
-        if ((hasattr(obj, '__class__')) and (re.match(r'^<class \'powerconsul\..*\.{0}\'>$'.format(cls), repr(obj.__class__)))):
-            return True
-        return False
+        # Test for a Power Consul class instance
+        return type(obj).__module__.startswith('powerconsul.')
 
     def get(self):
         """
@@ -112,15 +129,19 @@ class PowerConsul_Collection(object):
 
         :rtype: namedtuple
         """
-        def obj_mapper(d):
+        def obj_mapper(obj):
             """
-            Map a dictionary to a named tuple object based on dictionary keys
+            Recursively map dictionaries to named tuple objects based on dictionary keys.
 
-            :param d: The dictionary to map
-            :type d: dict
+            :param obj: The object to map
+            :type obj: *
             :rtype: namedtuple
             """
-            return namedtuple(self.class_name, d.keys())(*d.values())
+            if isinstance(obj, dict):
+                return record_class(self.class_name, tuple(obj.keys()))(*[obj_mapper(v) for v in obj.values()])
+            if isinstance(obj, (list, tuple)):
+                return [obj_mapper(v) for v in obj]
+            return obj
 
         # Check if creating a collection of classes
         class_collection = False
@@ -131,10 +152,9 @@ class PowerConsul_Collection(object):
 
         # Map the data to an object and return
         if class_collection:
-            return namedtuple(self.class_name, self.collection.keys())(*self.collection.values())
+            return record_class(self.class_name, tuple(self.collection.keys()))(*self.collection.values())
         else:
-            data = json.dumps(self.collection)
-            return json.loads(data, object_hook=obj_mapper)
+            return obj_mapper(self.collection)
 
     @classmethod
     def create(cls, data):
@@ -1,14 +1,53 @@
 import json
+from os import stat
 from sys import stderr, exit
 from os.path import expanduser, isfile
 
 # Power Consul modules
+from powerconsul.cache import PowerConsul_Cache
+from powerconsul.api import MAX_STALE
 from powerconsul.common.collection import PowerConsul_Collection
+from powerconsul.cache.datacenters import DATACENTERS_TTL
 
 # Local / Consul agent configuration
 CONSUL_CONFIG = '/etc/consul/config.json'
 LOCAL_CONFIG  = expanduser('~/.powerconsul.conf')
 
+# Configurations loaded by this process: path -> (signature, collection)
+_LOADED       = {}
+
+def load_config(path):
+    """
+    Load a JSON configuration file as a collection. Parsed configurations are cached
+    for the process and on disk, and revalidated against the file inode, mtime and
+    size, so repeat loads only cost a stat call.
+
+    :param path: The configuration file path
+    :type  path: str
+    :rtype: namedtuple
+    """
+    st        = stat(path)
+    signature = (st.st_ino, st.st_mtime, st.st_size)
+
+    # Already loaded by this process
+    if (path in _LOADED) and (_LOADED[path][0] == signature):
+        return _LOADED[path][1]
+
+    # Compiled snapshot shared by all processes
+    name     = 'config{0}'.format(path.replace('/', '_'))
+    snapshot = PowerConsul_Cache.load(name)
+    if snapshot and (snapshot['signature'] == signature):
+        data = snapshot['config']
+
+    # Parse the configuration and update the snapshot
+    else:
+        data = json.loads(open(path, 'r').read())
+        PowerConsul_Cache.dump(name, {'signature': signature, 'config': data})
+
+    # Convert to a collection
+    _LOADED[path] = (signature, PowerConsul_Collection.create(data))
+    return _LOADED[path][1]
+
 class PowerConsul_Config(object):
     """
     Configuration object for Power Consul interface.
@@ -17,6 +56,12 @@ class PowerConsul_Config(object):
         self.CONSUL     = self._getConsulConfig()
         self.LOCAL      = self._getLocalConfig()
 
+        # Datacenter cache TTL / stale read bound / service health cache TTL / span trace file
+        self.datacenterTTL  = self.get('local', 'datacenterTTL', default=DATACENTERS_TTL)
+        self.maxStale       = self.get('local', 'maxStale', default=MAX_STALE)
+        self.healthCacheTTL = self.get('local', 'healthCacheTTL', default=0)
+        self.traceFile      = self.get('local', 'traceFile')
+
     def die(self, message, code=1):
         stderr.write('{0}\n'.format(message))
         exit(code)
@@ -36,7 +81,7 @@ class PowerConsul_Config(object):
         Load and return the Consul agent configuration.
         """
         try:
-            return PowerConsul_Collection.create(json.loads(open(CONSUL_CONFIG, 'r').read()))
+            return load_config(CONSUL_CONFIG)
         except Exception as e:
             self.die('Failed to parse Consul agent configuration: {0}'.format(str(e)))
 
@@ -51,7 +96,7 @@ class PowerConsul_Config(object):
 
         # Parse the local configuration
         try:
-            return PowerConsul_Collection.create(json.loads(open(LOCAL_CONFIG).read()))
+            return load_config(LOCAL_CONFIG)
         except Exception as e:
             self.die('Failed to parse local configuration: {0}'.format(str(e)))
 
@@ -1,32 +1,65 @@
 from powerconsul.common import import_class
+from powerconsul.common.handlers.base import SUMMARIES
+
+# Handler registry: command -> (class, module)
+HANDLERS = {
+    "watch": ('PowerConsulHandler_Watchers', 'powerconsul.common.handlers.watchers'),
+    "trigger": ('PowerConsulHandler_Triggers', 'powerconsul.common.handlers.triggers'),
+    "check": ('PowerConsulHandler_Checks', 'powerconsul.common.handlers.checks'),
+    "config": ('PowerConsulHandler_Config', 'powerconsul.common.handlers.config'),
+    "agentd": ('PowerConsulHandler_Agentd', 'powerconsul.common.handlers.agentd'),
+    "kv": ('PowerConsulHandler_KV', 'powerconsul.common.handlers.kv'),
+    "cluster": ('PowerConsulHandler_Cluster', 'powerconsul.common.handlers.cluster')
+}
 
 class PowerConsulHandlers(object):
     """
-    Class object for loading command handlers.
+    Class object for loading command handlers. Handler modules are only imported
+    when a handler is requested.
     """
+
+    # Handlers imported by this process
+    _loaded = {}
+
     def _get_handler_args(self, handler):
         """
         Private method for returning handler argument attributes.
         """
         try:
             return {
-                "help": self._handlers.get(handler).help,
-                "options": self._handlers.get(handler).options,
-                "commands": self._handlers.get(handler).commands
+                "help": self.load(handler).help,
+                "options": self.load(handler).options,
+                "commands": self.load(handler).commands
             }
         except Exception as e:
             POWERCONSUL.die('Failed to retrieve handler attributes: {0}'.format(str(e)))
 
+    def names(self):
+        """
+        Return the names of all available handlers.
+        """
+        return HANDLERS.keys()
+
+    def summaries(self):
+        """
+        Return the summary for all available handlers without importing them.
+        """
+        return dict((handler, SUMMARIES[handler]) for handler in HANDLERS)
+
+    def load(self, handler):
+        """
+        Import a handler class, caching it for the process.
+        """
+        if not handler in self._loaded:
+            cls, mod = HANDLERS[handler]
+            self._loaded[handler] = import_class(cls, mod, init=False)
+        return self._loaded[handler]
+
     def all(self):
         """
         Return all available handlers.
         """
-        return {
-            "watch": import_class('PowerConsulHandler_Watchers', 'powerconsul.common.handlers.watchers', init=False),
-            "trigger": import_class('PowerConsulHandler_Triggers', 'powerconsul.common.handlers.triggers', init=False),
-            "check": import_class('PowerConsulHandler_Checks', 'powerconsul.common.handlers.checks', init=False),
-            "config": import_class('PowerConsulHandler_Config', 'powerconsul.common.handlers.config', init=False)
-        }
+        return dict((handler, self.load(handler)) for handler in HANDLERS)
 
     def get_args(self, handler=None):
         """
@@ -37,7 +70,7 @@ class PowerConsulHandlers(object):
 
         # Arguments for all handlers
         args = {}
-        for h in self._handlers.keys():
+        for h in HANDLERS.keys():
             args[h] = self._get_handler_args(h)
         return args
 
@@ -45,7 +78,8 @@ class PowerConsulHandlers(object):
         """
         Retrieve and initialize a command handler.
         """
-        return POWERCONSUL.ensure(self.all().get(handler, None),
-            isnot = None,
+        POWERCONSUL.ensure(handler in HANDLERS,
+            value = True,
             error = 'Attempted to load unsupported handler: {0}'.format(handler),
             code  = 1)
+        return self.load(handler)
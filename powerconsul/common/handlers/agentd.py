@@ -0,0 +1,49 @@
+import powerconsul.common.logger as logger
+from powerconsul.agentd import AGENTD_SOCKET
+from powerconsul.common.args.options import OPTIONS
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
+
+class PowerConsulHandler_Agentd(PowerConsulHandler_Base):
+    """
+    Class object for managing the resident check daemon.
+    """
+    id      = 'agentd'
+
+    # Command description
+    desc    = {
+        "title": "Power Consul Agent Daemon",
+        "summary": SUMMARIES['agentd'],
+        "usage": "powerconsul agentd [action] [options]"
+    }
+
+    # Supported options
+    options = [
+        {
+            "short": "k",
+            "long": "socket",
+            "help": "The Unix socket to listen on (default: {0}).".format(AGENTD_SOCKET),
+            "action": "store"
+        }
+    ] + OPTIONS
+
+    # Supported actions
+    commands = {
+        "start": {
+            "help": "Start the check daemon in the foreground."
+        }
+    }
+
+    def __init__(self):
+        super(PowerConsulHandler_Agentd, self).__init__(self.id)
+
+        # Setup the logger
+        POWERCONSUL.LOG = logger.create('agentd', log_file='/var/log/powerconsul/agentd.log')
+
+    def start(self):
+        """
+        Start the check daemon.
+        """
+        from powerconsul.agentd.server import PowerConsul_Agentd
+
+        # Serve forwarded checks
+        PowerConsul_Agentd(POWERCONSUL.ARGS.get('socket', default=AGENTD_SOCKET)).serve()
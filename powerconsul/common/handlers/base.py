@@ -1,16 +1,28 @@
 import json
 
+# Handler summaries, shared by the handler descriptions and the base command help
+SUMMARIES = {
+    "watch": "Watch Consul health checks",
+    "trigger": "Trigger events on service state changes.",
+    "check": "Run Consul checks against local resources.",
+    "config": "Manage local Power Consul configuration.",
+    "agentd": "Resident daemon for running Consul checks.",
+    "kv": "Verify KV data across datacenters.",
+    "cluster": "Report on clustered services."
+}
+
 class PowerConsulHandler_Base(object):
     """
     Base class for command handlers.
     """
     def __init__(self, handler):
-        POWERCONSUL.ARGS.construct(
-            desc = self.desc,
-            opts = self.options,
-            cmds = self.commands,
-            base = False
-        )
+        with POWERCONSUL.TRACE.span('args', handler=handler):
+            POWERCONSUL.ARGS.construct(
+                desc = self.desc,
+                opts = self.options,
+                cmds = self.commands,
+                base = False
+            )
 
         # Handler / command
         self.handler     = handler
@@ -4,11 +4,7 @@ from subprocess import Popen, PIPE
 
 # Power Consul modules
 from powerconsul.common.args.options import OPTIONS
-from powerconsul.common.handlers.base import PowerConsulHandler_Base
-from powerconsul.common.checks.service import Check_Service
-from powerconsul.common.checks.crontab import Check_Crontab
-from powerconsul.common.checks.process import Check_Process
-from powerconsul.common.checks.servicegroup import Check_ServiceGroup
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
 
 class PowerConsulHandler_Checks(PowerConsulHandler_Base):
     """
@@ -19,7 +15,7 @@ class PowerConsulHandler_Checks(PowerConsulHandler_Base):
     # Command description
     desc    = {
         "title": "Power Consul Triggers",
-        "summary": "Trigger events on service state changes.",
+        "summary": SUMMARIES['check'],
         "usage": "powerconsul trigger [action] [options]"
     }
 
@@ -123,22 +119,26 @@ class PowerConsulHandler_Checks(PowerConsulHandler_Base):
         """
         Check for a running process.
         """
+        from powerconsul.common.checks.process import Check_Process
         self._check(Check_Process())
 
     def crontab(self):
         """
         Check the crontab for a user.
         """
+        from powerconsul.common.checks.crontab import Check_Crontab
         self._check(Check_Crontab())
 
     def service(self):
         """
         Check a service state.
         """
+        from powerconsul.common.checks.service import Check_Service
         self._check(Check_Service())
 
     def servicegroup(self):
         """
         Check a logical service grouping.
         """
+        from powerconsul.common.checks.servicegroup import Check_ServiceGroup
         self._check(Check_ServiceGroup())
@@ -0,0 +1,160 @@
+import json
+
+import powerconsul.common.logger as logger
+from powerconsul.api import PowerConsul_API
+from powerconsul.api.health import worst_status
+from powerconsul.common.args.options import OPTIONS
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
+
+class PowerConsulHandler_Cluster(PowerConsulHandler_Base):
+    """
+    Class object for reporting on clustered services.
+    """
+    id      = 'cluster'
+
+    # Command description
+    desc    = {
+        "title": "Power Consul Cluster",
+        "summary": SUMMARIES['cluster'],
+        "usage": "powerconsul cluster [action] [options]"
+    }
+
+    # Supported options
+    options = [
+        {
+            "short": "f",
+            "long": "format",
+            "help": "The output format: table (default) or json.",
+            "action": "store"
+        }
+    ] + OPTIONS
+
+    # Supported actions
+    commands = {
+        "summary": {
+            "help": "Show active/standby roles and health for every clustered service."
+        }
+    }
+
+    def __init__(self):
+        super(PowerConsulHandler_Cluster, self).__init__(self.id)
+
+        # Setup the logger
+        POWERCONSUL.LOG = logger.create('cluster', log_file='/var/log/powerconsul/cluster.log')
+
+    def _fetch(self, clusterKey):
+        """
+        Read all cluster data with one recursive KV read, and all health checks with one
+        request per datacenter, concurrently.
+        """
+        def _call(target):
+            source, dc = target
+            if source == 'kv':
+                return POWERCONSUL.API_STALE.kv.get('{0}/'.format(clusterKey), recurse=True)[1] or []
+            return POWERCONSUL.API_STALE.health.state('any', dc=dc)[1]
+
+        # Cluster data / health checks per datacenter
+        targets = [('kv', None)] + [('health', dc) for dc in POWERCONSUL.datacenters]
+        results = PowerConsul_API.fanout(_call, targets)
+
+        # Any failed request
+        for target, call in results.iteritems():
+            if call['error']:
+                POWERCONSUL.die('Failed to read {0}{1}: {2}'.format(target[0], '' if not target[1] else ' ({0})'.format(target[1]), call['error']))
+
+        # Service check statuses by (service, node, datacenter)
+        checks  = {}
+        for source, dc in targets[1:]:
+            for check in results[(source, dc)]['result']:
+                if check.get('ServiceName'):
+                    checks.setdefault((check['ServiceName'], check['Node'], dc), []).append(check['Status'])
+
+        # Worst check wins per node / services with a passing node by datacenter
+        health  = {}
+        passing = set()
+        for (service, node, dc), statuses in checks.iteritems():
+            status = worst_status(statuses)
+            health[(service, node)] = worst_status([status, health.get((service, node), status)])
+            if status == 'passing':
+                passing.add((service, dc))
+        return results[('kv', None)]['result'], health, passing
+
+    def _group(self, service, group, data, health, passing):
+        """
+        Map a cluster data group to active/standby health.
+        """
+        row = {'service': service, 'filter': group, 'lock': bool(data.get('lock'))}
+
+        # Group by nodes
+        if 'active_nodes' in data:
+            row['group'] = 'nodes'
+            for role in ['active', 'standby']:
+                row[role] = dict((node, health.get((service, node), 'critical')) for node in data.get('{0}_nodes'.format(role)) or [])
+
+        # Group by datacenter
+        elif 'active_datacenter' in data:
+            row['group'] = 'datacenters'
+            for role in ['active', 'standby']:
+                dc        = data.get('{0}_datacenter'.format(role))
+                row[role] = {} if not dc else {dc: 'passing' if (service, dc) in passing else 'critical'}
+
+        # Unknown cluster data
+        else:
+            row.update({'group': None, 'active': {}, 'standby': {}})
+
+        # Any active member passing
+        row['passing'] = 'passing' in row['active'].values()
+        return row
+
+    def _table(self, rows):
+        """
+        Render summary rows as a table.
+        """
+        def members(m):
+            return ', '.join('{0}.{1}'.format(k, v) for k, v in sorted(m.iteritems())) or '-'
+
+        # Table cells
+        header = ['SERVICE', 'FILTER', 'ACTIVE', 'STANDBY', 'LOCK', 'PASSING']
+        cells  = [header] + [[
+            r['service'], r['filter'] or '-', members(r['active']), members(r['standby']),
+            'yes' if r['lock'] else 'no', 'yes' if r['passing'] else 'no'
+        ] for r in rows]
+
+        # Pad each column to its widest cell
+        widths = [max(len(c[i]) for c in cells) for i in range(len(header))]
+        return '\n'.join('  '.join(c[i].ljust(widths[i]) for i in range(len(header))).rstrip() for c in cells)
+
+    def summary(self):
+        """
+        Show active/standby roles and health for every clustered service.
+        """
+        clusterKey = POWERCONSUL.CONFIG.get('local', 'clusterKey')
+        outFormat  = POWERCONSUL.ARGS.get('format', default='table')
+
+        # Cluster key required
+        if not clusterKey:
+            POWERCONSUL.die('No cluster key configured!')
+        if not outFormat in ['table', 'json']:
+            POWERCONSUL.die('Unsupported format: {0}'.format(outFormat))
+        items, health, passing = self._fetch(clusterKey)
+
+        # Join cluster data and health in memory
+        rows = []
+        for item in sorted(items, key=lambda i: i['Key']):
+            service = item['Key'][len(clusterKey) + 1:]
+            try:
+                data = json.loads(item['Value'])
+            except Exception as e:
+                POWERCONSUL.LOG.error('Failed to parse cluster data for {0}: {1}'.format(service, str(e)), method='summary')
+                continue
+
+            # Filtered cluster groups
+            if 'filter' in data:
+                for group, groupData in sorted(data['filter'].iteritems()):
+                    rows.append(self._group(service, group, dict(groupData, lock=data.get('lock')), health, passing))
+            else:
+                rows.append(self._group(service, None, data, health, passing))
+
+        # Show the summary
+        POWERCONSUL.LOG.info('services={0}, groups={1}'.format(len(items), len(rows)), method='summary')
+        print(json.dumps(rows, indent=2, sort_keys=True) if outFormat == 'json' else self._table(rows))
@@ -1,8 +1,9 @@
 import json
 
 import powerconsul.common.logger as logger
+from powerconsul.cache.datacenters import PowerConsul_Datacenters
 from powerconsul.common.args.options import OPTIONS
-from powerconsul.common.handlers.base import PowerConsulHandler_Base
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
 
 class PowerConsulHandler_Config(PowerConsulHandler_Base):
     """
@@ -13,7 +14,7 @@ class PowerConsulHandler_Config(PowerConsulHandler_Base):
     # Command description
     desc    = {
         "title": "Power Consul Configuration",
-        "summary": "Manage local Power Consul configuration.",
+        "summary": SUMMARIES['config'],
         "usage": "powerconsul config [action] [options]"
     }
 
@@ -31,6 +32,9 @@ class PowerConsulHandler_Config(PowerConsulHandler_Base):
     commands = {
         "bootstrap": {
             "help": "Bootstrap the local configuration."
+        },
+        "datacenters": {
+            "help": "Refresh the cached list of Consul datacenters."
         }
     }
 
@@ -52,3 +56,13 @@ class PowerConsulHandler_Config(PowerConsulHandler_Base):
         # Write the local configuration
         POWERCONSUL.LOG.info('Bootstrapped local configuration: {0}'.format(json.dumps(config)), method='bootstrap')
         POWERCONSUL.CONFIG.writeLocal(config)
+
+    def datacenters(self):
+        """
+        Refresh the cached list of Consul datacenters.
+        """
+        dcs = PowerConsul_Datacenters.get(POWERCONSUL.API, refresh=True)
+
+        # Log and show the refreshed datacenters
+        POWERCONSUL.LOG.info('Refreshed datacenters: {0}'.format(','.join(dcs)), method='datacenters')
+        print('\n'.join(dcs))
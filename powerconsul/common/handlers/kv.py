@@ -0,0 +1,81 @@
+import json
+from sys import exit
+
+import powerconsul.common.logger as logger
+from powerconsul.common.args.options import OPTIONS
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
+
+class PowerConsulHandler_KV(PowerConsulHandler_Base):
+    """
+    Class object for managing Power Consul KV data.
+    """
+    id      = 'kv'
+
+    # Command description
+    desc    = {
+        "title": "Power Consul KV",
+        "summary": SUMMARIES['kv'],
+        "usage": "powerconsul kv [action] [options]"
+    }
+
+    # Supported options
+    options = [
+        {
+            "short": "p",
+            "long": "prefix",
+            "help": "The KV prefix to verify, i.e. cluster/",
+            "action": "store"
+        },
+        {
+            "short": "r",
+            "long": "repair",
+            "help": "Repair divergent keys by copying them from the source datacenter.",
+            "action": "store_true"
+        },
+        {
+            "short": "s",
+            "long": "source",
+            "help": "The datacenter to repair divergent keys from.",
+            "action": "store"
+        }
+    ] + OPTIONS
+
+    # Supported actions
+    commands = {
+        "verify": {
+            "help": "Compare KV data under a prefix across all datacenters."
+        }
+    }
+
+    def __init__(self):
+        super(PowerConsulHandler_KV, self).__init__(self.id)
+
+        # Setup the logger
+        POWERCONSUL.LOG = logger.create('kv', log_file='/var/log/powerconsul/kv.log')
+
+    def verify(self):
+        """
+        Report keys that differ between datacenters, and optionally repair them.
+        """
+        prefix = POWERCONSUL.ARGS.get('prefix', required='Must supply a KV prefix to verify: powerconsul kv verify -p <prefix>')
+        repair = POWERCONSUL.ARGS.get('repair')
+        source = POWERCONSUL.ARGS.get('source')
+
+        # Repairs need a source datacenter
+        if repair and not source:
+            POWERCONSUL.die('Must supply a source datacenter to repair from: powerconsul kv verify -p <prefix> -r -s <datacenter>')
+
+        try:
+            divergent = POWERCONSUL.KV.verify(prefix, repair=repair, source=source)
+        except Exception as e:
+            POWERCONSUL.die('Failed to verify KV data: {0}'.format(str(e)))
+
+        # Log each divergent key
+        for key, state in sorted(divergent.iteritems()):
+            POWERCONSUL.LOG.info('key={0}, state={1}'.format(key, json.dumps(state, sort_keys=True)), method='verify')
+        POWERCONSUL.LOG.info('prefix={0}, divergent={1}, repair={2}'.format(prefix, len(divergent), bool(repair)), method='verify')
+        print(json.dumps(divergent, indent=2, sort_keys=True))
+
+        # Exit non-zero if any divergent keys were not repaired
+        failed = [key for key, state in divergent.iteritems() if not repair or not all(s.get('repaired', True) for s in state.itervalues())]
+        exit(1 if failed else 0)
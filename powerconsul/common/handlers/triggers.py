@@ -7,7 +7,7 @@ from subprocess import Popen, PIPE
 
 # Power Consul modules
 from powerconsul.common.args.options import OPTIONS
-from powerconsul.common.handlers.base import PowerConsulHandler_Base
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
 
 class PowerConsulHandler_Triggers(PowerConsulHandler_Base):
     """
@@ -18,7 +18,7 @@ class PowerConsulHandler_Triggers(PowerConsulHandler_Base):
     # Command description
     desc    = {
         "title": "Power Consul Triggers",
-        "summary": "Trigger events on service state changes.",
+        "summary": SUMMARIES['trigger'],
         "usage": "powerconsul trigger [action] [options]"
     }
 
@@ -6,7 +6,7 @@ from subprocess import Popen
 # Power Consul modules
 import powerconsul.common.logger as logger
 from powerconsul.common.args.options import OPTIONS
-from powerconsul.common.handlers.base import PowerConsulHandler_Base
+from powerconsul.common.handlers.base import PowerConsulHandler_Base, SUMMARIES
 
 class PowerConsulHandler_Watchers(PowerConsulHandler_Base):
     """
@@ -17,7 +17,7 @@ class PowerConsulHandler_Watchers(PowerConsulHandler_Base):
     # Command description
     desc    = {
         "title": "Power Consul Watchers",
-        "summary": "Watch Consul health checks",
+        "summary": SUMMARIES['watch'],
         "usage": "powerconsul watch [state] [options]"
     }
 
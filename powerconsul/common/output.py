@@ -1,19 +1,47 @@
 import json
 from sys import stdout, exit
 
+# Power Consul modules
+from powerconsul.api import PowerConsul_API
+from powerconsul.api.metrics import PowerConsul_Metrics
+from powerconsul.common.trace import PowerConsul_Trace
+
 class PowerConsul_Output(object):
     """
     Static methods for writing output and exit codes.
     """
+    @staticmethod
+    def _stats():
+        """
+        Log Consul API usage for the invocation, and export it to the metrics textfile
+        if configured.
+        """
+        stats   = PowerConsul_API.stats()
+        summary = PowerConsul_Metrics.summary()
+        POWERCONSUL.LOG.info('connections={0}, requests={1}, calls={2}, errors={3}, bytes={4}, api_ms={5}, slowest={6}'.format(
+            stats['connections'], stats['requests'], summary['calls'], summary['errors'], summary['bytes'],
+            int(summary['seconds'] * 1000), summary['slowest']
+        ), method='api.stats')
+
+        # node_exporter textfile
+        textfile = POWERCONSUL.CONFIG.get('local', 'metricsTextfile')
+        if textfile and not PowerConsul_Metrics.export(textfile):
+            POWERCONSUL.LOG.error('Failed to export metrics: {0}'.format(textfile), method='api.stats')
+
     @staticmethod
     def passing(message):
-        try:
-            message['state'] = 'passing'
-            message['code']  = 0
-            stdout.write('{0}\n'.format(json.dumps(message)))
-        except:
-            stdout.write('{0}\n'.format(message))
-        POWERCONSUL.LOG.info(message, method='ensure.passing')
+        with PowerConsul_Trace.span('output', state='passing'):
+            try:
+                message['state'] = 'passing'
+                message['code']  = 0
+                stdout.write('{0}\n'.format(json.dumps(message)))
+            except:
+                stdout.write('{0}\n'.format(message))
+            POWERCONSUL.LOG.info(message, method='ensure.passing')
+            PowerConsul_Output._stats()
+
+        # Write trace spans before exiting
+        PowerConsul_Trace.flush()
         exit(0)
 
     @staticmethod
@@ -21,13 +49,18 @@ class PowerConsul_Output(object):
         """
         Show a warning message and exit 1.
         """
-        try:
-            message['state'] = 'warning'
-            message['code']  = 1
-            stdout.write('{0}\n'.format(json.dumps(message)))
-        except:
-            stdout.write('{0}\n'.format(message))
-        POWERCONSUL.LOG.warning(message, method='ensure.warning')
+        with PowerConsul_Trace.span('output', state='warning'):
+            try:
+                message['state'] = 'warning'
+                message['code']  = 1
+                stdout.write('{0}\n'.format(json.dumps(message)))
+            except:
+                stdout.write('{0}\n'.format(message))
+            POWERCONSUL.LOG.warning(message, method='ensure.warning')
+            PowerConsul_Output._stats()
+
+        # Write trace spans before exiting
+        PowerConsul_Trace.flush()
         exit(1)
 
     @staticmethod
@@ -35,11 +68,16 @@ class PowerConsul_Output(object):
         """
         Show a critical message and exit 2.
         """
-        try:
-            message['state'] = 'critical'
-            message['code']  = code
-            stdout.write('{0}\n'.format(json.dumps(message)))
-        except:
-            stdout.write('{0}\n'.format(message))
-        POWERCONSUL.LOG.critical(message, method='ensure.critical')
+        with PowerConsul_Trace.span('output', state='critical'):
+            try:
+                message['state'] = 'critical'
+                message['code']  = code
+                stdout.write('{0}\n'.format(json.dumps(message)))
+            except:
+                stdout.write('{0}\n'.format(message))
+            POWERCONSUL.LOG.critical(message, method='ensure.critical')
+            PowerConsul_Output._stats()
+
+        # Write trace spans before exiting
+        PowerConsul_Trace.flush()
         exit(code)
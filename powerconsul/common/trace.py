@@ -0,0 +1,182 @@
+import os
+import json
+import fcntl
+import atexit
+from time import time
+from functools import wraps
+from socket import gethostname
+from contextlib import contextmanager
+
+# Power Consul modules
+from powerconsul.api.metrics import PowerConsul_Metrics
+
+# Rotate the trace file once it grows past this many bytes
+TRACE_MAX_BYTES = 10 * 1024 * 1024
+
+class PowerConsul_Trace(object):
+    """
+    Lightweight span tracing for a single invocation. Spans are buffered in memory
+    and appended to a JSONL trace file when flushed, one span per line. Nothing is
+    written unless a trace file is configured.
+    """
+
+    # Trace file for the invocation (disabled if not set, see the 'traceFile' configuration key)
+    path    = None
+
+    # Trace ID for the invocation / attributes for every span / open spans, innermost last / finished spans
+    _trace  = os.urandom(8).encode('hex')
+    _tags   = {}
+    _stack  = []
+    _spans  = []
+
+    @classmethod
+    def reset(cls):
+        """
+        Start a new trace and forget all spans and the trace file, i.e. after forking.
+        """
+        cls.path   = None
+        cls._trace = os.urandom(8).encode('hex')
+        cls._tags.clear()
+        del cls._stack[:]
+        del cls._spans[:]
+
+    @classmethod
+    def _end(cls, span, status):
+        """
+        End a span and queue it for the next flush.
+        """
+        span['end']         = time()
+        span['duration_ms'] = round((span['end'] - span['start']) * 1000, 3)
+        span['status']      = status
+
+        # Consul API calls made during the span
+        calls, seconds      = PowerConsul_Metrics.since(span.pop('_calls'))
+        span['attributes'].update({'api_calls': calls, 'api_ms': round(seconds * 1000, 3)})
+        cls._spans.append(span)
+
+    @classmethod
+    @contextmanager
+    def span(cls, name, **attributes):
+        """
+        Trace a block of code. Yields the span attributes, which can be updated before
+        the block ends. Spans are nested by the order they are opened.
+        """
+        span = {
+            'trace': cls._trace,
+            'span': os.urandom(4).encode('hex'),
+            'parent': None if not cls._stack else cls._stack[-1]['span'],
+            'name': name,
+            'host': gethostname(),
+            'pid': os.getpid(),
+            'start': time(),
+            'attributes': attributes,
+            '_calls': PowerConsul_Metrics.count()
+        }
+        cls._stack.append(span)
+        status = 'ok'
+        try:
+            yield attributes
+
+        # Exiting from within the span / failed
+        except SystemExit:
+            status = 'exit'
+            raise
+        except Exception as e:
+            status = 'error'
+            attributes['error'] = str(e)
+            raise
+
+        # Already ended if flushed while open
+        finally:
+            cls._stack.remove(span)
+            if not 'end' in span:
+                cls._end(span, status)
+
+    @classmethod
+    def traced(cls, name):
+        """
+        Decorator for tracing a function or method as a span.
+        """
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def annotate(cls, **attributes):
+        """
+        Add attributes to the innermost open span.
+        """
+        if cls._stack:
+            cls._stack[-1]['attributes'].update(attributes)
+
+    @classmethod
+    def tag(cls, **attributes):
+        """
+        Add attributes to every span of the invocation, i.e. the Consul service.
+        """
+        cls._tags.update(attributes)
+
+    @classmethod
+    def _open(cls):
+        """
+        Open the trace file for appending under an exclusive lock. A full trace file is
+        rotated first, keeping one backup, and a file rotated by another process while
+        waiting for the lock is reopened, so spans are never appended to the backup.
+        """
+        while True:
+            f = open(cls.path, 'a')
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                opened  = os.fstat(f.fileno())
+                current = os.stat(cls.path)
+
+                # Still the trace file, not full
+                if (opened.st_ino == current.st_ino) and (opened.st_size <= TRACE_MAX_BYTES):
+                    return f
+
+                # Rotate a full trace file
+                if opened.st_ino == current.st_ino:
+                    os.rename(cls.path, '{0}.1'.format(cls.path))
+
+            # Moved away while waiting for the lock
+            except OSError:
+                pass
+            f.close()
+
+    @classmethod
+    def flush(cls):
+        """
+        Append finished spans to the trace file. Spans still open are ended first with
+        an 'exit' status, so spans are complete when flushing right before exiting.
+        Tracing is best effort, returns False if the trace file could not be written.
+        """
+        for span in cls._stack:
+            if not 'end' in span:
+                cls._end(span, 'exit')
+
+        # Nothing to write
+        spans = [dict(span, attributes=dict(cls._tags, **span['attributes'])) for span in cls._spans]
+        del cls._spans[:]
+        if not cls.path or not spans:
+            return True
+
+        try:
+            trace_dir = os.path.dirname(cls.path)
+            if trace_dir and not os.path.isdir(trace_dir):
+                os.makedirs(trace_dir, 0755)
+
+            # Append all spans in a single write under an exclusive lock
+            with cls._open() as f:
+                f.write(''.join('{0}\n'.format(json.dumps(span, sort_keys=True)) for span in spans))
+            return True
+
+        # Failed to write the trace file
+        except Exception:
+            return False
+
+# Write any remaining spans when the process exits
+atexit.register(PowerConsul_Trace.flush)
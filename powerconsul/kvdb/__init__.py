@@ -1,9 +1,23 @@
 from __future__ import print_function
 import json
-from time import sleep
-from consul import Consul
+from math import ceil
+from time import sleep, time
+from hashlib import sha1
+from base64 import b64encode
+from consul.base import CB, ClientError
 from termcolor import colored
-from powerconsul.kvdb.datatypes import Timestamp_Data
+from powerconsul.api import PowerConsul_API
+from powerconsul.kvdb.codec import PowerConsul_KVCodec
+from powerconsul.cache.datacenters import PowerConsul_Datacenters, DATACENTERS_TTL
+
+# Maximum operations Consul accepts in a single transaction
+TXN_MAX_OPS = 64
+
+class PowerConsul_KVDB_Conflict(Exception):
+    """
+    Raised when a check-and-set write loses to a concurrent update.
+    """
+    pass
 
 class PowerConsul_KVDB(object):
     """
@@ -11,9 +25,12 @@ class PowerConsul_KVDB(object):
     interface for accessing KV data assumes you want the same
     data in all datacenters.
     """
-    def __init__(self, get_local=True, put_local=True, base_path=None):
-        self.api = Consul()
-        self.dcs = self.api.catalog.datacenters()
+    def __init__(self, get_local=True, put_local=True, base_path=None, api=None, datacenter_ttl=DATACENTERS_TTL):
+
+        # Consul API client (shared unless supplied) / datacenters (retrieved on first use) / datacenter cache TTL
+        self._api    = api
+        self._dcs    = None
+        self._dc_ttl = datacenter_ttl
 
         # Should we default to get/put data from local dc?
         self.get_local = get_local
@@ -22,65 +39,44 @@ class PowerConsul_KVDB(object):
         # A base path to prepend to keys
         self.base_path = base_path
 
-    def _parse_bool(self, string):
-        """
-        Attempt to parse a boolean string.
-        """
+        # Modify indexes last seen by this instance: (dc, key) -> index, where dc is None
+        # for the local datacenter
+        self._indexes  = {}
 
-        # True values
-        if string in ['1', 'true', 'True']:
-            return True
+        # Loaded prefix snapshots: (dc, key) -> entry / loaded (dc, prefix) pairs
+        self._snapshot = {}
+        self._prefixes = set()
 
-        # False values
-        if string in ['0', 'false', 'False']:
-            return False
+    @property
+    def api(self):
+        """
+        Consul API client.
+        """
+        if not self._api:
+            self._api = PowerConsul_API.client()
+        return self._api
 
-        raise Exception('Could not parse boolean value from: {0}'.format(string))
+    @property
+    def dcs(self):
+        """
+        All Consul datacenters, retrieved on first use.
+        """
+        if self._dcs is None:
+            self._dcs = PowerConsul_Datacenters.get(self.api, ttl=self._dc_ttl)
+        return self._dcs
 
     def _dump_data_value(self, data):
         """
-        Dump data value to string before put operations.
+        Dump data value to a (string, flags) tuple before put operations. The flags
+        carry the value type.
         """
+        return PowerConsul_KVCodec.dump(data)
 
-        # JSON?
-        if isinstance(data, (dict, list)):
-            return json.dumps(data)
-
-        # All other
-        return data
-
-    def _load_data_value(self, data):
+    def _load_data_value(self, data, flags=0):
         """
         Process any returned data from a KV get operation.
         """
-
-        # Boolean?
-        try:
-            return self._parse_bool(data)
-        except: pass
-
-        # Timestamp?
-        try:
-            return Timestamp_Data(string)
-        except: pass
-
-        # Float?
-        try:
-            return float(data)
-        except: pass
-
-        # Integer?
-        try:
-            return int(data)
-        except: pass
-
-        # JSON data?
-        try:
-            return json.loads(data)
-        except: pass
-
-        # Default to string
-        return data
+        return PowerConsul_KVCodec.load(data, flags)
 
     def _map_key(self, key):
         """
@@ -102,81 +98,502 @@ class PowerConsul_KVDB(object):
         # No data found, create new entry
         if not data:
             return None
-        return index
+        return data['ModifyIndex']
 
-    def wait(self, key, value=None, sleep_time=1, message=None):
+    def _index_key(self, key, dc=None):
         """
-        Wait for a KV to change or to become a specified value.
+        Return the modify index cache key for a KV key. Reads and writes addressed to the
+        local datacenter by name share the entry of local (dc=None) operations.
         """
-        _key = self._map_key(key)
-        if message:
-            print(message, end='')
+        if dc and (dc == PowerConsul_Datacenters.local(self.api, ttl=self._dc_ttl)):
+            return (None, key)
+        return (dc, key)
+
+    def _wait_local(self, key, value, expires, block_time):
+        """
+        Wait on the local datacenter using blocking queries. Wakes up as soon as the
+        modify index of the key changes.
+        """
+        index, data = self.api.kv.get(key)
+        init_value  = None if not data else self._load_data_value(data['Value'], data['Flags'])
+        observed    = init_value
 
-        init_value = self.get(_key, map=False)
         while True:
             if not value:
-                if self.get(_key, map=False) != init_value:
-                    break
+                if observed != init_value:
+                    return True, observed
             else:
-                if self.get(_key, map=False) == value:
-                    break
+                if observed == value:
+                    return True, observed
+
+            # Time remaining before giving up
+            wait = block_time
+            if expires:
+                remaining = expires - time()
+                if remaining <= 0:
+                    return False, observed
+                wait = max(1, min(block_time, int(ceil(remaining))))
+
+            # Block until the key changes or the wait time elapses
+            last_index  = index
+            index, data = self.api.kv.get(key, index=index, wait='{0}s'.format(wait))
+            observed    = None if not data else self._load_data_value(data['Value'], data['Flags'])
+
+            # Index went backwards, start over from a fresh read
+            if index and last_index and (int(index) < int(last_index)):
+                index = None
+
+    def _wait_all(self, key, value, expires, sleep_time):
+        """
+        Wait on all datacenters by polling. Blocking queries cannot span datacenters.
+        """
+        init_value = self.get(key, map=False, cached=False)
+        while True:
+            observed = self.get(key, map=False, cached=False)
+            if not value:
+                if observed != init_value:
+                    return True, observed
+            else:
+                if observed == value:
+                    return True, observed
+
+            # Give up
+            if expires and (time() >= expires):
+                return False, observed
             sleep(sleep_time)
+
+    def wait(self, key, value=None, sleep_time=1, message=None, timeout=None, block_time=30):
+        """
+        Wait for a KV to change or to become a specified value. Returns the observed value.
+
+        :param        key: The KV key path
+        :param      value: Wait for this value, or any change if not set
+        :param sleep_time: Polling interval when waiting on all datacenters
+        :param    message: An optional progress message
+        :param    timeout: Seconds to wait before raising an exception, wait forever if not set
+        :param block_time: Maximum seconds for a single blocking query
+        """
+        _key    = self._map_key(key)
+        expires = None if timeout is None else (time() + timeout)
+        if message:
+            print(message, end='')
+
+        # Wait for the value
+        if self.get_local:
+            changed, observed = self._wait_local(_key, value, expires, block_time)
+        else:
+            changed, observed = self._wait_all(_key, value, expires, sleep_time)
+
+        # Timed out
+        if not changed:
+            if message:
+                print(colored('FAILED', 'red'))
+            raise Exception('Timed out waiting for KV data: key={0}, timeout={1}s'.format(_key, timeout))
+
         if message:
             print(colored('SUCCESS', 'green'))
+        return observed
+
+    def changes(self, prefix='', map=True, initial=True, block_time=30, retry_time=1, max_retry_time=30):
+        """
+        Follow changes under a prefix in the local datacenter using blocking queries.
+        Yields (key, old, new, index) for each created, updated or deleted key, where
+        old/new are None for created/deleted keys. Resumes from the last index after
+        errors, backing off up to max_retry_time seconds.
+
+        :param         prefix: The KV key prefix
+        :param        initial: Yield existing keys as created on the first read
+        :param     block_time: Maximum seconds for a single blocking query
+        :param     retry_time: Initial seconds to wait after a failed query
+        :param max_retry_time: Maximum seconds to wait after a failed query
+        """
+        _prefix = prefix if not map else self._map_key(prefix)
+        known   = None
+        index   = None
+        backoff = retry_time
+
+        while True:
+            try:
+                last_index   = index
+                index, items = self.api.kv.get(_prefix, recurse=True, index=index, wait='{0}s'.format(block_time))
+            except Exception:
+                index = last_index
+                sleep(backoff)
+                backoff = min(backoff * 2, max_retry_time)
+                continue
+            backoff = retry_time
+
+            # Index went backwards, start over from a fresh read
+            if index and last_index and (int(index) < int(last_index)):
+                index = None
+                continue
+
+            # Current keys: key -> (modify index, value)
+            current = {}
+            for item in items or []:
+                current[item['Key']] = (item['ModifyIndex'], self._load_data_value(item['Value'], item['Flags']))
+                self._indexes[self._index_key(item['Key'])] = item['ModifyIndex']
+
+            # First read
+            if known is None:
+                known = {} if initial else current
+
+            # Created / updated keys
+            for key, (mindex, value) in sorted(current.iteritems()):
+                if key not in known:
+                    yield key, None, value, mindex
+                elif known[key][0] != mindex:
+                    yield key, known[key][1], value, mindex
+
+            # Deleted keys
+            for key in sorted(set(known) - set(current)):
+                self._indexes.pop(self._index_key(key), None)
+                yield key, known[key][1], None, int(index)
+            known = current
+
+    def _cas_put(self, key, data, flags, dc=None, mindex=None):
+        """
+        Perform a check and set operation, or a plain put for a new key.
+        """
+        if not mindex:
+            return self.api.kv.put(key, data, flags=flags, dc=dc)
+        return self.api.kv.put(key, data, flags=flags, dc=dc, cas=mindex)
+
+    def _put_dc(self, key, data, flags, dc=None):
+        """
+        Check-and-set a KV value in a single datacenter. Uses the modify index last
+        seen by this instance, only reading a fresh index if there is none. If the key
+        changed since it was read, the write fails with a conflict, read the key again
+        before retrying.
+        """
+        ikey    = self._index_key(key, dc)
+        mindex  = self._indexes.pop(ikey) if ikey in self._indexes else self._get_modify_index(key, dc=dc)
+        success = self._cas_put(key, data, flags, dc, mindex)
+
+        # Keep any loaded snapshot in step with the write
+        self._invalidate(key, dc)
+        if success and self._prefixes:
+            self._snapshot[(dc, key)] = self._snapshot_entry(data, flags)
+        return {
+            'success': bool(success),
+            'index': mindex,
+            'conflict': not success,
+            'error': None if success else 'Check-and-set conflict: key={0}, index={1}'.format(key, mindex)
+        }
+
+    def _get_dc(self, key, dc, cached=True):
+        """
+        Get a KV value from a single datacenter, reading through any loaded snapshot.
+        """
+        hit, entry = (False, None) if not cached else self.cached(key, dc, map=False)
+        if hit:
+            if not entry:
+                return {'success': False, 'index': None, 'value': None, 'error': 'Key not found'}
+            return {'success': True, 'index': entry['index'], 'value': entry['raw'], 'flags': entry['flags'], 'error': None}
+        index, data = self.api.kv.get(key, dc=dc)
+
+        # Key not found
+        if not data:
+            return {'success': False, 'index': index, 'value': None, 'error': 'Key not found'}
+        self._indexes[self._index_key(key, dc)] = data['ModifyIndex']
+        return {'success': True, 'index': data['ModifyIndex'], 'value': data['Value'], 'flags': data['Flags'], 'error': None}
+
+    def _snapshot_entry(self, data, flags, index=None):
+        """
+        Build a snapshot entry for a raw KV value.
+        """
+        return {'value': self._load_data_value(data, flags), 'raw': data, 'flags': flags, 'index': index}
+
+    def _snapshot_dc(self, prefix, dc=None):
+        """
+        Load every key under a prefix from a single datacenter in one recursive read.
+        """
+        index, items = self.api.kv.get(prefix, recurse=True, dc=dc)
+        keys         = {}
+
+        # Index each key with its typed value
+        for item in items or []:
+            keys[item['Key']] = self._snapshot_entry(item['Value'], item['Flags'], item['ModifyIndex'])
+            self._snapshot[(dc, item['Key'])] = keys[item['Key']]
+            self._indexes[self._index_key(item['Key'], dc)] = item['ModifyIndex']
+        self._prefixes.add((dc, prefix))
+        return {'success': True, 'index': index, 'keys': keys, 'error': None}
+
+    def _invalidate(self, key, dc=None):
+        """
+        Invalidate a snapshot entry so the next read goes to Consul. A write to any
+        datacenter also invalidates the local datacenter entry.
+        """
+        if self._prefixes:
+            self._snapshot[(dc, key)]   = None
+            self._snapshot[(None, key)] = None
+
+    def cached(self, key, dc=None, map=True):
+        """
+        Look up a key in the loaded snapshots. Returns (True, entry) if a snapshot covers
+        the key, where entry is None if the key does not exist, or (False, None) if the
+        key must be read from Consul.
+        """
+        _key = key if not map else self._map_key(key)
+
+        # Key was loaded, or invalidated by a write
+        if (dc, _key) in self._snapshot:
+            entry = self._snapshot[(dc, _key)]
+            return (False, None) if entry is None else (True, entry)
+
+        # Key falls under a loaded prefix but does not exist
+        for _dc, prefix in self._prefixes:
+            if _dc == dc and _key.startswith(prefix):
+                return True, None
+        return False, None
+
+    def snapshot(self, prefix='', map=True):
+        """
+        Load every key under a prefix with one recursive read per datacenter (or the
+        local datacenter only if get_local is set). Later reads of keys under the prefix
+        are served from memory. Returns a map of datacenter ('local' for the local
+        datacenter) -> {key: {'value', 'raw', 'flags', 'index'}}.
+
+        :param prefix: The KV key prefix
+        """
+        _prefix = prefix if not map else self._map_key(prefix)
+
+        # Use local datacenter
+        if self.get_local:
+            return {'local': self._snapshot_dc(_prefix)['keys']}
+
+        # Load all datacenters concurrently
+        results = self.check(self._fanout(lambda dc: self._snapshot_dc(_prefix, dc)))
+        return dict((dc, r['keys']) for dc, r in results.iteritems())
+
+    def _fanout(self, func):
+        """
+        Run a per-datacenter operation concurrently, returning a map of datacenter -> result.
+        """
+        results = {}
+        for dc, call in PowerConsul_API.fanout(func, self.dcs).iteritems():
+            results[dc] = call['result'] if not call['error'] else {'success': False, 'index': None, 'error': call['error']}
+        return results
+
+    @staticmethod
+    def check(results):
+        """
+        Raise an exception if an operation failed in any datacenter, otherwise return
+        the per-datacenter results. Raises PowerConsul_KVDB_Conflict if any failure was
+        a check-and-set conflict.
+        """
+        failed = ['{0}: {1}'.format(dc, r['error']) for dc, r in sorted(results.iteritems()) if not r['success']]
+        if failed:
+            error = PowerConsul_KVDB_Conflict if any(r.get('conflict') for r in results.itervalues()) else Exception
+            raise error('KV operation failed: {0}'.format(', '.join(failed)))
+        return results
 
     def put(self, key, value):
         """
         Put KV data to the cluster. Use the Check-and-Set (cas) parameter to make this an
-        atomic operation.
+        atomic operation. When putting to all datacenters, returns a map of
+        datacenter -> {'success': bool, 'index': int, 'conflict': bool, 'error': str}.
+        When putting to the local datacenter, raises PowerConsul_KVDB_Conflict if the
+        key was updated concurrently.
 
         :param    key: The KV key path
         :param  value: The new KV value
         """
-        _data = self._dump_data_value(value)
-        _key  = self._map_key(key)
+        _data, _flags = self._dump_data_value(value)
+        _key          = self._map_key(key)
 
         # Use local datacenter
         if self.put_local:
+            result = self._put_dc(_key, _data, _flags)
+            if result['conflict']:
+                raise PowerConsul_KVDB_Conflict(result['error'])
+            return True
 
-            # Get the last modify index
-            mindex = self._get_modify_index(_key)
+        # Put to all datacenters concurrently
+        return self._fanout(lambda dc: self._put_dc(_key, _data, _flags, dc))
 
-            # Perform a check and set operation
-            if not mindex:
-                return self.api.kv.put(_key, _data)
+    def _txn_indexes(self, keys, dc=None):
+        """
+        Return the modify index of each key in a single datacenter, 0 for new keys. Uses
+        the modify indexes last seen by this instance, and reads the rest with one
+        recursive read per parent path holding several of them, or one read per key.
+        """
+        ikeys   = dict((key, self._index_key(key, dc)) for key in keys)
+        indexes = dict((key, self._indexes.pop(ikeys[key])) for key in keys if ikeys[key] in self._indexes)
+        missing = [key for key in keys if not key in indexes]
+
+        # Missing keys by parent path
+        parents = {}
+        for key in missing:
+            parents.setdefault(None if not '/' in key else '{0}/'.format(key.rsplit('/', 1)[0]), []).append(key)
+
+        # Sibling keys / single or top level keys
+        found   = {}
+        for parent, siblings in parents.iteritems():
+            if parent and (len(siblings) > 1):
+                index, items = self.api.kv.get(parent, recurse=True, dc=dc)
+                found.update((item['Key'], item['ModifyIndex']) for item in items or [])
             else:
-                return self.api.kv.put(_key, _data, cas=mindex)
+                for key in siblings:
+                    index, data = self.api.kv.get(key, dc=dc)
+                    found[key]  = 0 if not data else data['ModifyIndex']
+        for key in missing:
+            indexes[key] = found.get(key, 0)
+        return indexes
+
+    def _txn_dc(self, entries, dc=None):
+        """
+        Check-and-set KV values in a single datacenter, one transaction per chunk of
+        TXN_MAX_OPS values. Stops at the first failed chunk, earlier chunks stay applied.
+        """
+        params  = [] if not dc else [('dc', dc)]
+        indexes = self._txn_indexes([key for key, data, flags in entries], dc)
+        index   = None
+        applied = 0
+
+        # Submit each chunk as an atomic transaction
+        for i in range(0, len(entries), TXN_MAX_OPS):
+            chunk = [{'KV': {
+                'Verb': 'cas',
+                'Key': key,
+                'Value': data,
+                'Flags': flags,
+                'Index': indexes[key]
+            }} for key, data, flags in entries[i:i + TXN_MAX_OPS]]
+            try:
+                result = self.api.http.put(CB.json(), '/v1/txn', params=params, data=json.dumps(chunk))
+
+            # Rolled back: a key was updated concurrently / request failed
+            except Exception as e:
+                conflict = isinstance(e, ClientError) and str(e).startswith('409')
+                return {
+                    'success': False,
+                    'index': index,
+                    'applied': applied,
+                    'conflict': conflict,
+                    'error': '{0} after {1}/{2} values: {3}'.format('Check-and-set conflict' if conflict else 'Transaction failed', applied, len(entries), str(e))
+                }
+
+            # Track the latest modify index / invalidate written keys in any loaded snapshot
+            applied += len(chunk)
+            for op in chunk:
+                self._invalidate(op['KV']['Key'], dc)
+            for r in (result or {}).get('Results') or []:
+                if (index is None) or (r['KV']['ModifyIndex'] > index):
+                    index = r['KV']['ModifyIndex']
+        return {'success': True, 'index': index, 'applied': applied, 'conflict': False, 'error': None}
+
+    def put_many(self, items):
+        """
+        Put many KV values at once using the Consul transaction API. Each datacenter
+        costs one request per TXN_MAX_OPS keys, plus one read for modify indexes not
+        already seen. Keys are written with check-and-set, and all keys in a request
+        are updated atomically within that datacenter.
+
+        Writes are not atomic across chunks or datacenters: a conflict or failure stops
+        that datacenter at the failed chunk, while other datacenters may have applied
+        every value. Returns a map of datacenter -> {'success': bool, 'index': int,
+        'applied': int, 'conflict': bool, 'error': str}, where 'applied' is the number
+        of values written, so callers can detect mixed state.
+
+        :param items: A dictionary of KV key paths to values
+        """
+        entries = []
+        for key, value in sorted(items.iteritems()):
+            data, flags = self._dump_data_value(value)
+            entries.append((self._map_key(key), b64encode(data.encode('utf-8') if isinstance(data, unicode) else str(data)), flags))
 
-        # Put to all datacenters
-        for dc in self.dcs:
+        # Use local datacenter
+        if self.put_local:
+            return {'local': self._txn_dc(entries)}
 
-            # Get the last modify index
-            mindex = self._get_modify_index(_key, dc=dc)
+        # Put to all datacenters concurrently
+        return self._fanout(lambda dc: self._txn_dc(entries, dc))
 
-            # Perform a check and set operation
-            if not mindex:
-                self.api.kv.put(_key, _data, dc=dc)
-            else:
-                self.api.kv.put(_key, _data, dc=dc, cas=mindex)
+    def get_all(self, key, map=True, cached=True):
+        """
+        Retrieve raw values from all datacenters concurrently. Returns a map of
+        datacenter -> {'success': bool, 'index': int, 'value': str, 'error': str}.
+        """
+        _key = key if not map else self._map_key(key)
+        return self._fanout(lambda dc: self._get_dc(_key, dc, cached))
 
-    def get(self, key, map=True):
+    def get(self, key, map=True, cached=True):
         """
-        Retrieve and compare values from datacenters.
+        Retrieve and compare values from datacenters. Keys under a loaded snapshot
+        are read from memory unless cached is False.
         """
-        retval = []
         _key   = key if not map else self._map_key(key)
 
         # Use local datacenter
         if self.get_local:
+            hit, entry = (False, None) if not cached else self.cached(_key, map=False)
+            if hit:
+                return None if not entry else entry['value']
             index, data = self.api.kv.get(_key)
-            return self._load_data_value(data['Value'])
+
+            # Key not found
+            if data is None:
+                return None
+            self._indexes[self._index_key(_key)] = data['ModifyIndex']
+            return self._load_data_value(data['Value'], data['Flags'])
 
         # Get all datacenters
-        for dc in self.dcs:
-            index, data = self.api.kv.get(_key, dc=dc)
-            retval.append(data['Value'])
+        results = self.get_all(_key, map=False, cached=cached)
+        retval  = [results[dc].get('value') for dc in self.dcs]
 
         # Compare values
-        if not all(retval):
+        if not all(retval) or (len(set(retval)) > 1):
             raise Exception('KV data mismatch: key={0}, dcs={1}'.format(key, ','.join(self.dcs)))
-        return self._load_data_value(retval[0])
+        return self._load_data_value(retval[0], results[self.dcs[0]]['flags'])
+
+    def _repair_dc(self, key, entry, index, dc):
+        """
+        Copy a key from the source datacenter, or delete it if the source has no such
+        key. Uses check-and-set on the modify index seen when verifying.
+        """
+        if not entry:
+            return bool(self.api.kv.delete(key, cas=index, dc=dc))
+        return bool(self.api.kv.put(key, entry['raw'], flags=entry['flags'], cas=index or 0, dc=dc))
+
+    def verify(self, prefix='', map=True, repair=False, source=None):
+        """
+        Compare every key under a prefix across all datacenters, reading each datacenter
+        with one recursive request in parallel. Returns a map of divergent key ->
+        datacenter -> {'sha1': str, 'index': int}, where sha1/index are None if the key
+        is missing. If repair is set, divergent keys are copied from the source
+        datacenter with check-and-set writes and 'repaired' is added for each target.
+
+        :param prefix: The KV key prefix
+        :param repair: Repair divergent keys
+        :param source: The datacenter to repair from
+        """
+        _prefix = prefix if not map else self._map_key(prefix)
+
+        # Repairs need a known good datacenter
+        if repair and not source in self.dcs:
+            raise Exception('Repair source must be one of: {0}'.format(','.join(self.dcs)))
+        results = self.check(self._fanout(lambda dc: self._snapshot_dc(_prefix, dc)))
+
+        # Compare content hashes for every key seen in any datacenter
+        divergent = {}
+        for key in sorted(set(k for r in results.itervalues() for k in r['keys'])):
+            state = {}
+            for dc in self.dcs:
+                entry     = results[dc]['keys'].get(key)
+                state[dc] = {
+                    'sha1': None if not entry else sha1(entry['raw'] or '').hexdigest(),
+                    'index': None if not entry else entry['index']
+                }
+            if len(set(s['sha1'] for s in state.itervalues())) > 1:
+                divergent[key] = state
+
+        # Repair from the source datacenter
+        if repair:
+            for key, state in divergent.iteritems():
+                entry = results[source]['keys'].get(key)
+                for dc in self.dcs:
+                    if state[dc]['sha1'] != state[source]['sha1']:
+                        state[dc]['repaired'] = self._repair_dc(key, entry, state[dc]['index'], dc)
+                        self._invalidate(key, dc)
+        return divergent
@@ -0,0 +1,119 @@
+import json
+from powerconsul.kvdb.datatypes import Timestamp_Data
+
+# Type tags are stored in the KV flags field, marked by the upper 16 bits
+FLAG_MAGIC      = 0x50430000
+FLAG_MASK       = 0xFFFF0000
+
+# Value types (strings are written untagged, TYPE_STRING is only read)
+TYPE_STRING     = 1
+TYPE_BOOL       = 2
+TYPE_INT        = 3
+TYPE_FLOAT      = 4
+TYPE_JSON       = 5
+TYPE_TIMESTAMP  = 6
+
+# Boolean strings
+BOOL_TRUE       = frozenset(['1', 'true', 'True'])
+BOOL_FALSE      = frozenset(['0', 'false', 'False'])
+
+# First characters of values that float()/json.loads() could parse
+_FLOAT_START    = frozenset('0123456789+-.iInN')
+_JSON_START     = frozenset('{["n')
+
+class PowerConsul_KVCodec(object):
+    """
+    Encode and decode typed KV values. Non-string values written by Power Consul carry
+    a type tag in the KV flags. Strings and untagged (legacy) values are decoded by
+    sniffing, so pre-serialized values such as JSON strings load as before.
+    """
+    @staticmethod
+    def dump(value):
+        """
+        Dump a value to a (string, flags) tuple for put operations.
+        """
+
+        # Boolean (before integer, bool is an int subclass)
+        if isinstance(value, bool):
+            return ('true' if value else 'false'), (FLAG_MAGIC | TYPE_BOOL)
+
+        # Numbers
+        if isinstance(value, (int, long)):
+            return str(value), (FLAG_MAGIC | TYPE_INT)
+        if isinstance(value, float):
+            return repr(value), (FLAG_MAGIC | TYPE_FLOAT)
+
+        # JSON
+        if isinstance(value, (dict, list)):
+            return json.dumps(value), (FLAG_MAGIC | TYPE_JSON)
+
+        # Timestamp
+        if isinstance(value, Timestamp_Data):
+            return repr(value), (FLAG_MAGIC | TYPE_TIMESTAMP)
+
+        # Strings and other values are untyped
+        return value, 0
+
+    @staticmethod
+    def sniff(data):
+        """
+        Decode an untagged value in a single pass. Produces the same results as trying
+        boolean, float, JSON and string parsing in turn, but only attempts a parser
+        when the value could match it.
+        """
+        if data is None:
+            return None
+
+        # Boolean?
+        if data in BOOL_TRUE:
+            return True
+        if data in BOOL_FALSE:
+            return False
+
+        # Empty or whitespace only string
+        stripped = data.strip()
+        if not stripped:
+            return data
+
+        # Float?
+        if stripped[0] in _FLOAT_START:
+            try:
+                return float(data)
+            except ValueError:
+                pass
+
+        # JSON data?
+        if stripped[0] in _JSON_START:
+            try:
+                return json.loads(data)
+            except ValueError:
+                pass
+
+        # Default to string
+        return data
+
+    @classmethod
+    def load(cls, data, flags=0):
+        """
+        Decode a value returned by a KV get operation.
+        """
+        if (flags & FLAG_MASK) != FLAG_MAGIC:
+            return cls.sniff(data)
+
+        # Tagged value
+        vtype = flags & ~FLAG_MASK
+        if vtype == TYPE_STRING:
+            return cls.sniff(data)
+        if vtype == TYPE_BOOL:
+            return data in BOOL_TRUE
+        if vtype == TYPE_INT:
+            return int(data)
+        if vtype == TYPE_FLOAT:
+            return float(data)
+        if vtype == TYPE_JSON:
+            return json.loads(data)
+        if vtype == TYPE_TIMESTAMP:
+            return Timestamp_Data(data)
+
+        # Unknown type
+        return cls.sniff(data)
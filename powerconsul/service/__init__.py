@@ -6,7 +6,7 @@ from sys import argv
 from time import sleep
 from subprocess import Popen, PIPE
 from powerconsul.service.vars import CHROLE
-from powerconsul.kvdb import PowerConsul_KVDB as KVDB
+from powerconsul.kvdb import PowerConsul_KVDB as KVDB, PowerConsul_KVDB_Conflict
 from powerconsul.service.base import PowerConsul_ServiceBase
 from powerconsul.service.cluster import PowerConsul_ServiceCluster
 
@@ -22,11 +22,14 @@ class PowerConsul_Service(PowerConsul_ServiceBase):
         self.local   = [name] if not local_services else local_services
 
         # Service KV database
-        self.kv      = KVDB(base_path='service/{0}'.format(consul_service))
+        self.kv      = KVDB(base_path='service/{0}'.format(consul_service), datacenter_ttl=self.CONF.datacenterTTL)
 
         # Lock file to force a passing state for a check
         self.lock    = noop_lockfile
 
+        # Following flag changes
+        self.watching = False
+
         # Parse the service command
         self.command = self._get_command()
 
@@ -50,7 +53,8 @@ class PowerConsul_Service(PowerConsul_ServiceBase):
             'status': self.do_status,
             'start-primary': self.do_start_primary,
             'demote': self.do_demote,
-            'promote': self.do_promote
+            'promote': self.do_promote,
+            'watch': self.do_watch
         }
 
         # Invalid command
@@ -242,45 +246,89 @@ class PowerConsul_Service(PowerConsul_ServiceBase):
         self.cluster.demote_primary_complete()
         self.cluster.promote_secondary_complete()
 
-    def do_promote(self):
+    def _conflict(self, kvpath, error):
         """
-        Promote the secondary node after calling start-primary.
+        Report a flag changed by another writer since it was read. When watching, the
+        new value arrives as the next change, otherwise exit.
+        """
+        message = 'Flag changed concurrently, not updated: {0} ({1})'.format(kvpath, str(error))
+        if not self.watching:
+            self.die(message)
+        print(message)
+
+    def _promote(self, data):
+        """
+        Act on the value of the promotion flag.
         """
         kvpath = '{0}/promote'.format(self.host)
-        data   = self.kv.get(kvpath)
 
         # Start promotion
         if data == CHROLE.START:
             self._lock()
-            self.kv.put(kvpath, CHROLE.WAIT)
+            try:
+                self.kv.put(kvpath, CHROLE.WAIT)
+            except PowerConsul_KVDB_Conflict as e:
+                self._conflict(kvpath, e)
 
         # Unlock after demotion completed
         if data == CHROLE.NULL:
             self.do_start(force=True)
             self._unlock()
 
-    def do_demote(self):
+    def _demote(self, data):
         """
-        Demote the current primary if starting up a secondary.
+        Act on the value of the demotion flag.
         """
         kvpath = '{0}/demote'.format(self.host)
-        data   = self.kv.get(kvpath)
 
         # Start demotion
         if data == CHROLE.START:
             self._lock()
             self.do_stop(force=True)
-            self.kv.put(kvpath, CHROLE.WAIT)
+            try:
+                self.kv.put(kvpath, CHROLE.WAIT)
+            except PowerConsul_KVDB_Conflict as e:
+                self._conflict(kvpath, e)
 
         # Unlock after demotion completed
         if data == CHROLE.NULL:
             self._unlock()
 
+    def do_promote(self):
+        """
+        Promote the secondary node after calling start-primary.
+        """
+        self._promote(self.kv.get('{0}/promote'.format(self.host)))
+
+    def do_demote(self):
+        """
+        Demote the current primary if starting up a secondary.
+        """
+        self._demote(self.kv.get('{0}/demote'.format(self.host)))
+
+    def do_watch(self):
+        """
+        Follow the promotion/demotion flags for this node and act on each change.
+        Replaces separate Consul watches for the promote and demote commands.
+        """
+        handlers = {
+            'promote': self._promote,
+            'demote': self._demote
+        }
+        self.watching = True
+
+        # Flag changes under service/<consul_service>/<host>/
+        for key, old, new, index in self.kv.changes('{0}/'.format(self.host)):
+            flag = key.rsplit('/', 1)[-1]
+            if flag in handlers:
+                print('{0}: {1} -> {2} (index={3})'.format(key, old, new, index))
+                handlers[flag](new)
+
     def usage(self):
         """
         Print usage information.
         """
-        self.die('Usage: service {0} {start|stop|restart|start-primary|status|demote}'.format(self.name))
+        self.die('Usage: service {0} {{start|stop|restart|start-primary|status|promote|demote|watch}}'.format(self.name))
 
     @classmethod
     def process(cls, name, consul_service, local_services=None, noop_lockfile=None):
@@ -1,10 +1,11 @@
 import re
 import json
-from consul import Consul
 from termcolor import colored
 from socket import gethostname
 from sys import stderr, stdout, exit
+from powerconsul.api import PowerConsul_API
 from powerconsul.common.config import PowerConsul_Config
+from powerconsul.cache.datacenters import PowerConsul_Datacenters
 
 class PowerConsul_ServiceBase(object):
     """
@@ -12,12 +13,13 @@ class PowerConsul_ServiceBase(object):
     """
     def __init__(self):
 
-        # Consul API and PowerConsul configuration
-        self.API     = Consul()
+        # PowerConsul configuration and Consul API (default / stale reads)
         self.CONF    = PowerConsul_Config.parseStatic()
+        self.API     = PowerConsul_API.client()
+        self.STALE   = PowerConsul_API.client('stale', self.CONF.maxStale)
 
         # All datacenters
-        self.dcs     = self.API.catalog.datacenters()
+        self.dcs     = self._get_datacenters()
 
         # Local machine name
         self.host    = gethostname()
@@ -27,15 +29,13 @@ class PowerConsul_ServiceBase(object):
         self.re      = re
         self.colored = colored
 
-        # Test API connection
-        self._test_api()
-
-    def _test_api(self):
+    def _get_datacenters(self):
         """
-        Make sure API connectivity is healthy.
+        Retrieve all datacenters, making sure API connectivity is healthy if the
+        datacenter cache needs to be refreshed.
         """
         try:
-            self.API.catalog.datacenters()
+            return PowerConsul_Datacenters.get(self.API, ttl=self.CONF.datacenterTTL)
         except:
             self.die('Consul API error! Consul agent must be running...')
 
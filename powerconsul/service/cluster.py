@@ -1,5 +1,7 @@
 from __future__ import print_function
-from powerconsul.service.vars import CHROLE
+from powerconsul.service.vars import CHROLE, CHROLE_TIMEOUT
+from powerconsul.api import PowerConsul_API
+from powerconsul.api.health import PowerConsul_Health
 from powerconsul.kvdb import PowerConsul_KVDB as KVDB
 from powerconsul.service.base import PowerConsul_ServiceBase
 from powerconsul.common.config import PowerConsul_Config
@@ -7,8 +9,11 @@ from powerconsul.common.config import PowerConsul_Config
 class _KVDB_Mapper(PowerConsul_ServiceBase):
     def __init__(self, consul_service):
         super(_KVDB_Mapper, self).__init__()
-        self.cluster = KVDB(base_path=self.CONF.LOCAL.clusterKey, put_local=False)
-        self.service = KVDB(base_path='service/{0}'.format(consul_service), put_local=False)
+
+        # Cluster data for status (stale reads) and role switches (consistent reads)
+        self.cluster    = KVDB(base_path=self.CONF.LOCAL.clusterKey, put_local=False, api=self.STALE, datacenter_ttl=self.CONF.datacenterTTL)
+        self.consistent = KVDB(base_path=self.CONF.LOCAL.clusterKey, put_local=False, api=PowerConsul_API.client('consistent'), datacenter_ttl=self.CONF.datacenterTTL)
+        self.service = KVDB(base_path='service/{0}'.format(consul_service), put_local=False, datacenter_ttl=self.CONF.datacenterTTL)
 
 class PowerConsul_ServiceCluster(PowerConsul_ServiceBase):
     """
@@ -72,116 +77,103 @@ class PowerConsul_ServiceCluster(PowerConsul_ServiceBase):
         checks are back into a passing state for all nodes.
         """
         print('Switching cluster primary/secondary node roles...', end='')
-        self.kv.cluster.put(self.name, {
-            'active_nodes': self.standby_nodes,
-            'standby_nodes': self.active_nodes,
-            'lock': True
-        })
+
+        try:
+
+            # Make sure the roles did not change since the switch started
+            data = self.kv.consistent.get(self.name)
+            if data.get('active_nodes') != self.active_nodes:
+                raise Exception('Cluster data changed: active_nodes={0}'.format(data.get('active_nodes')))
+            KVDB.check(self.kv.consistent.put(self.name, {
+                'active_nodes': self.standby_nodes,
+                'standby_nodes': self.active_nodes,
+                'lock': True
+            }))
+        except Exception as e:
+            print(self.colored('FAILED', 'red'))
+            self.die('Failed to switch cluster roles: {0}'.format(str(e)))
+        print(self.colored('SUCCESS', 'green'))
+
+    def _signal(self, nodes, flag, value, message, error):
+        """
+        Set a promotion/demotion flag for a list of nodes in a single transaction
+        per datacenter.
+        """
+        print('{0} {1}...'.format(message, ', '.join(nodes)), end='')
+
+        try:
+            KVDB.check(self.kv.service.put_many(dict(('{0}/{1}'.format(node, flag), value) for node in nodes)))
+        except Exception as e:
+            print(self.colored('FAILED', 'red'))
+            self.die('{0}: {1}'.format(error, str(e)))
         print(self.colored('SUCCESS', 'green'))
 
     def promote_secondary(self):
         """
         Promote the secondary node(s) to primary.
         """
-        for node in self.standby_nodes:
-            print('Starting promotion for node {0}...'.format(node), end='')
-
-            try:
-                self.kv.service.put('{0}/promote'.format(node), CHROLE.START)
-            except Exception as e:
-                print(self.colored('FAILED', 'red'))
-                self.die('Failed to signal promote secondary: {0}'.format(str(e)))
-            print(self.colored('SUCCESS', 'green'))
+        self._signal(self.standby_nodes, 'promote', CHROLE.START,
+            message = 'Starting promotion for nodes',
+            error   = 'Failed to signal promote secondary')
 
     def demote_primary(self):
         """
         Demote the primary node(s) to secondary.
         """
-        for node in self.active_nodes:
-            print('Starting demotion for node {0}...'.format(node), end='')
+        self._signal(self.active_nodes, 'demote', CHROLE.START,
+            message = 'Starting demotion for nodes',
+            error   = 'Failed to signal demote primary')
 
+    def _wait(self, nodes, flag, message):
+        """
+        Wait for every node to acknowledge a promotion/demotion flag, giving up after
+        the configured role switch timeout.
+        """
+        timeout = self.CONF.get('local', 'roleSwitchTimeout', default=CHROLE_TIMEOUT)
+        for node in nodes:
             try:
-                self.kv.service.put('{0}/demote'.format(node), CHROLE.START)
+                self.kv.service.wait('{0}/{1}'.format(node, flag), CHROLE.WAIT, message=message.format(node), timeout=timeout)
             except Exception as e:
-                print(self.colored('FAILED', 'red'))
-                self.die('Failed to signal demote primary: {0}'.format(str(e)))
-            print(self.colored('SUCCESS', 'green'))
+                self.die('Node {0} did not complete the role switch within {1}s, {2} flags left in place: {3}'.format(node, timeout, flag, str(e)))
 
     def promote_secondary_wait(self):
         """
         Wait for secondary promotion to complete.
         """
-        for node in self.standby_nodes:
-            self.kv.service.wait('{0}/promote'.format(node), CHROLE.WAIT,
-                message='Promoting secondary node {0}...'.format(node))
+        self._wait(self.standby_nodes, 'promote', 'Promoting secondary node {0}...')
 
     def demote_primary_wait(self):
         """
         Wait for primary demotion to complete.
         """
-        for node in self.active_nodes:
-            self.kv.service.wait('{0}/demote'.format(node), CHROLE.WAIT,
-                message='Demoting primary node {0}...'.format(node))
+        self._wait(self.active_nodes, 'demote', 'Demoting primary node {0}...')
 
     def promote_secondary_complete(self):
         """
         Update KV after promotion complete.
         """
-        for node in self.standby_nodes:
-            print('Clearing promotion trigger for node {0}...'.format(node), end='')
-
-            try:
-                self.kv.service.put('{0}/promote'.format(node), CHROLE.NULL)
-            except Exception as e:
-                print(self.colored('FAILED', 'red'))
-                self.die('Failed to clear promotion trigger: {0}'.format(str(e)))
-            print(self.colored('SUCCESS', 'green'))
+        self._signal(self.standby_nodes, 'promote', CHROLE.NULL,
+            message = 'Clearing promotion trigger for nodes',
+            error   = 'Failed to clear promotion trigger')
 
     def demote_primary_complete(self):
         """
         Update KV after demotion is complete.
         """
-        for node in self.active_nodes:
-            print('Clearing demotion trigger for node {0}...'.format(node), end='')
-
-            try:
-                self.kv.service.put('{0}/demote'.format(node), CHROLE.NULL)
-            except Exception as e:
-                print(self.colored('FAILED', 'red'))
-                self.die('Failed to clear demotion trigger: {0}'.format(str(e)))
-            print(self.colored('SUCCESS', 'green'))
+        self._signal(self.active_nodes, 'demote', CHROLE.NULL,
+            message = 'Clearing demotion trigger for nodes',
+            error   = 'Failed to clear demotion trigger')
 
     def get_cluster_services(self):
         """
         Get all services and health.
         """
-        services    = []
-        srvFilter   = self.CONF.get('local', 'serviceFilter')
-
-        # Generate a list of Consul services from the API
-        for dc in self.dcs:
-            services = services + self.API.health.service(self.name, dc=dc)[1]
-
-        # Mapped services
         mappedServices = {}
 
-        # Process raw services
-        for srv in services:
-            node   = srv['Node']['Node']
-
-            # Get the check status
-            try:
-                status = srv['Checks'][1]['Status']
-            except:
-                status = 'critical'
-
-            # Service regex filter
-            if srvFilter and not self.re.compile(srvFilter).match(node):
-                continue
-
-            # Map the service
-            mappedServices[node] = {
-                'status': status
+        # Collect service health from all datacenters
+        for service in PowerConsul_Health(self.name, self.dcs, self.CONF.get('local', 'serviceFilter'), api=self.STALE):
+            mappedServices[service['node']] = {
+                'status': service['status']
             }
 
         # Return mapped services
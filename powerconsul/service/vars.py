@@ -6,3 +6,6 @@ CHROLE = PowerConsul_Collection.create({
     'START': 'START',
     'WAIT': 'WAIT'
 })
+
+# Default seconds to wait for nodes to finish a promotion/demotion
+CHROLE_TIMEOUT = 300
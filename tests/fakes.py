@@ -0,0 +1,146 @@
+import json
+from shutil import rmtree
+from tempfile import mkdtemp
+from base64 import b64decode
+from consul.base import Response
+
+import powerconsul.cache
+from powerconsul.cache.datacenters import PowerConsul_Datacenters
+
+def isolate(test):
+    """
+    Point the host-wide cache at a temporary directory and forget process caches for
+    the duration of a test.
+    """
+    cache_dir = powerconsul.cache.CACHE_DIR
+    powerconsul.cache.CACHE_DIR = mkdtemp()
+    PowerConsul_Datacenters._loaded = None
+    PowerConsul_Datacenters._local  = None
+
+    def _restore(tmp=powerconsul.cache.CACHE_DIR):
+        rmtree(tmp, ignore_errors=True)
+        powerconsul.cache.CACHE_DIR = cache_dir
+        PowerConsul_Datacenters._loaded = None
+        PowerConsul_Datacenters._local  = None
+    test.addCleanup(_restore)
+
+class FakeConsul(object):
+    """
+    In-memory Consul API with a KV store per datacenter. Records every request as
+    (method, path, dc) in 'requests'.
+    """
+    def __init__(self, dcs=('dc1', 'dc2'), local='dc1'):
+        self.dcs      = list(dcs)
+        self.local    = local
+        self.stores   = dict((dc, {}) for dc in dcs)
+        self.index    = 100
+        self.requests = []
+
+        # API endpoints
+        self.kv       = FakeKV(self)
+        self.http     = FakeHTTP(self)
+        self.agent    = FakeAgent(self)
+        self.catalog  = FakeCatalog(self)
+
+    def store(self, dc=None):
+        return self.stores[dc or self.local]
+
+    def seed(self, key, value, flags=0, dcs=None):
+        """
+        Write a value directly, bypassing the request log.
+        """
+        for dc in dcs or self.dcs:
+            self._set(dc, key, value, flags)
+
+    def _set(self, dc, key, value, flags=0):
+        self.index += 1
+        entry = self.store(dc).get(key)
+        self.store(dc)[key] = {
+            'Key': key,
+            'Value': value,
+            'Flags': flags or 0,
+            'CreateIndex': self.index if not entry else entry['CreateIndex'],
+            'ModifyIndex': self.index
+        }
+        return self.index
+
+    def cas_ok(self, dc, key, cas):
+        """
+        Check-and-set semantics: 0 only creates, any other index must match.
+        """
+        entry = self.store(dc).get(key)
+        if cas == 0:
+            return entry is None
+        return entry is not None and entry['ModifyIndex'] == cas
+
+    def count(self, method=None, path=None):
+        return len([r for r in self.requests if (method is None or r[0] == method) and (path is None or r[1].startswith(path))])
+
+class FakeKV(object):
+    def __init__(self, consul):
+        self.consul = consul
+
+    def get(self, key, index=None, recurse=False, wait=None, token=None, consistency=None, keys=False, separator=None, dc=None):
+        self.consul.requests.append(('get', '/v1/kv/{0}'.format(key), dc))
+        store = self.consul.store(dc)
+        if recurse:
+            items = [dict(store[k]) for k in sorted(store) if k.startswith(key)]
+            return str(self.consul.index), items or None
+        return str(self.consul.index), None if not key in store else dict(store[key])
+
+    def put(self, key, value, cas=None, flags=None, acquire=None, release=None, token=None, dc=None):
+        self.consul.requests.append(('put', '/v1/kv/{0}'.format(key), dc))
+        dc = dc or self.consul.local
+        if (cas is not None) and not self.consul.cas_ok(dc, key, int(cas)):
+            return False
+        self.consul._set(dc, key, value, flags)
+        return True
+
+    def delete(self, key, recurse=None, cas=None, token=None, dc=None):
+        self.consul.requests.append(('delete', '/v1/kv/{0}'.format(key), dc))
+        dc = dc or self.consul.local
+        if (cas is not None) and not self.consul.cas_ok(dc, key, int(cas)):
+            return False
+        self.consul.store(dc).pop(key, None)
+        return True
+
+class FakeHTTP(object):
+    def __init__(self, consul):
+        self.consul = consul
+
+    def put(self, callback, path, params=None, data=''):
+        dc = dict(params or []).get('dc')
+        self.consul.requests.append(('put', path, dc))
+        dc = dc or self.consul.local
+        if path != '/v1/txn':
+            return callback(Response(404, {'X-Consul-Index': '0'}, ''))
+
+        # All operations must pass their check-and-set, otherwise roll back
+        ops    = json.loads(data)
+        errors = [{'OpIndex': i, 'What': 'failed to set key'} for i, op in enumerate(ops)
+                  if op['KV']['Verb'] == 'cas' and not self.consul.cas_ok(dc, op['KV']['Key'], op['KV']['Index'])]
+        if errors:
+            return callback(Response(409, {'X-Consul-Index': str(self.consul.index)}, json.dumps({'Results': None, 'Errors': errors})))
+
+        # Apply the transaction
+        results = []
+        for op in ops:
+            self.consul._set(dc, op['KV']['Key'], b64decode(op['KV']['Value']), op['KV']['Flags'])
+            results.append({'KV': dict(self.consul.store(dc)[op['KV']['Key']], Value=None)})
+        return callback(Response(200, {'X-Consul-Index': str(self.consul.index)}, json.dumps({'Results': results, 'Errors': None})))
+
+class FakeAgent(object):
+    def __init__(self, consul):
+        self.consul = consul
+
+    def self(self):
+        self.consul.requests.append(('get', '/v1/agent/self', None))
+        return {'Config': {'Datacenter': self.consul.local}}
+
+class FakeCatalog(object):
+    def __init__(self, consul):
+        self.consul = consul
+
+    def datacenters(self):
+        self.consul.requests.append(('get', '/v1/catalog/datacenters', None))
+        return list(self.consul.dcs)
@@ -0,0 +1,56 @@
+import __builtin__
+import unittest
+
+from fakes import FakeConsul, isolate
+from powerconsul.common import PowerConsulCommon
+from powerconsul.kvdb import PowerConsul_KVDB
+
+class FakeLog(object):
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+class TestClusterDataRoundtrip(unittest.TestCase):
+    """
+    Cluster data written by checks (putKV) and read by service scripts.
+    """
+    def setUp(self):
+        isolate(self)
+        self.consul = FakeConsul()
+
+        # Power Consul commons writing through the fake API
+        common       = PowerConsulCommon()
+        common.LOG   = FakeLog()
+        common._kv   = PowerConsul_KVDB(put_local=False, api=self.consul)
+        common._kv._dcs = self.consul.dcs
+        __builtin__.POWERCONSUL = common
+        self.addCleanup(delattr, __builtin__, 'POWERCONSUL')
+
+    def service_kv(self):
+        """
+        Cluster KV databases as set up by powerconsul.service.cluster._KVDB_Mapper.
+        """
+        kv      = PowerConsul_KVDB(base_path='cluster', put_local=False, api=self.consul)
+        kv._dcs = self.consul.dcs
+        return kv
+
+    def test_failover_roundtrip(self):
+        POWERCONSUL.putKV('cluster/web', {'active_nodes': ['node2'], 'standby_nodes': ['node1']}, all_dcs=True)
+
+        # Read back as a dictionary by service scripts
+        data = self.service_kv().get('web')
+        self.assertEqual(data['active_nodes'], ['node2'])
+        self.assertEqual(data['standby_nodes'], ['node1'])
+
+    def test_switch_roles_roundtrip(self):
+        kv = self.service_kv()
+        POWERCONSUL.putKV('cluster/web', {'active_nodes': ['node1'], 'standby_nodes': ['node2']}, all_dcs=True)
+
+        # switch_roles: consistent read, then write to all datacenters
+        data = kv.get('web')
+        PowerConsul_KVDB.check(kv.put('web', {'active_nodes': data['standby_nodes'], 'standby_nodes': data['active_nodes'], 'lock': True}))
+        data = self.service_kv().get('web')
+        self.assertEqual(data['active_nodes'], ['node2'])
+        self.assertEqual(data['lock'], True)
+
+if __name__ == '__main__':
+    unittest.main()
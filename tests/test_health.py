@@ -0,0 +1,47 @@
+import unittest
+import threading
+
+from powerconsul.api.health import PowerConsul_Health, worst_status
+
+class FakeHealthAPI(object):
+    """
+    Consul health endpoint serving fixed service entries per datacenter.
+    """
+    def __init__(self, entries):
+        self.health  = self
+        self.entries = entries
+
+    def service(self, service, dc=None):
+        return '1', self.entries[dc]
+
+def entry(node, *statuses):
+    checks = [{'CheckID': 'serfHealth', 'ServiceName': '', 'Status': 'passing'}]
+    return {'Node': {'Node': node}, 'Checks': checks + [{'ServiceName': 'web', 'Status': s} for s in statuses]}
+
+class TestHealthStatus(unittest.TestCase):
+    """
+    Service status aggregated from health checks.
+    """
+    def test_worst_status(self):
+        self.assertEqual(worst_status(['passing', 'warning']), 'warning')
+        self.assertEqual(worst_status(['critical', 'passing']), 'critical')
+        self.assertEqual(worst_status(['passing', 'maintenance']), 'critical')
+        self.assertEqual(worst_status([]), 'critical')
+
+    def test_service_checks(self):
+        api     = FakeHealthAPI({None: [entry('node1', 'passing', 'critical'), entry('node2', 'passing'), entry('node3')]})
+        records = list(PowerConsul_Health('web', api=api))
+        self.assertEqual(dict((r['node'], r['status']) for r in records), {'node1': 'critical', 'node2': 'passing', 'node3': 'critical'})
+
+    def test_early_exit(self):
+        api     = FakeHealthAPI(dict(('dc{0}'.format(i), [entry('node{0}'.format(i), 'passing')]) for i in range(4)))
+        threads = threading.active_count()
+
+        # Stop after the first record, the pool workers are shut down
+        records = iter(PowerConsul_Health('web', sorted(api.entries), api=api))
+        next(records)
+        records.close()
+        self.assertEqual(threading.active_count(), threads)
+
+if __name__ == '__main__':
+    unittest.main()
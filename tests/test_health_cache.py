@@ -0,0 +1,59 @@
+import fcntl
+import unittest
+from time import time
+
+import powerconsul.cache.health
+from fakes import isolate
+from powerconsul.cache import PowerConsul_Cache
+from powerconsul.cache.health import PowerConsul_HealthCache
+
+class TestHealthCache(unittest.TestCase):
+    """
+    Host-wide health snapshots refreshed by a single process.
+    """
+    def setUp(self):
+        isolate(self)
+
+        # Short refresh timeout
+        timeout = powerconsul.cache.health.HEALTH_REFRESH_TIMEOUT
+        powerconsul.cache.health.HEALTH_REFRESH_TIMEOUT = 0.2
+        self.addCleanup(setattr, powerconsul.cache.health, 'HEALTH_REFRESH_TIMEOUT', timeout)
+
+    def hold(self, name):
+        """
+        Hold a cache lock as another process would.
+        """
+        f = open(PowerConsul_Cache.path('.{0}.lock'.format(name)), 'a')
+        fcntl.flock(f, fcntl.LOCK_EX)
+        self.addCleanup(f.close)
+
+    def test_lock(self):
+        with PowerConsul_Cache.lock('entry', timeout=0.2) as locked:
+            self.assertTrue(locked)
+
+    def test_lock_timeout(self):
+        self.hold('entry')
+        start = time()
+        with PowerConsul_Cache.lock('entry', timeout=0.2) as locked:
+            self.assertFalse(locked)
+        self.assertTrue(time() - start >= 0.2)
+
+    def test_refresh(self):
+        calls   = []
+        collect = lambda: calls.append(1) or [{'node': 'node1', 'status': 'passing', 'dc': None}]
+        for i in range(2):
+            records = PowerConsul_HealthCache.get('web', None, collect, 60)
+
+        # Second process reads the snapshot
+        self.assertEqual(records, [{'node': 'node1', 'status': 'passing', 'dc': None}])
+        self.assertEqual(len(calls), 1)
+
+    def test_stalled_refresh(self):
+        self.hold(PowerConsul_HealthCache.name('web'))
+
+        # Refresher holds the lock too long, the waiter queries Consul itself
+        records = PowerConsul_HealthCache.get('web', None, lambda: [{'node': 'node1', 'status': 'critical', 'dc': None}], 60)
+        self.assertEqual(records[0]['status'], 'critical')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+
+from powerconsul.kvdb.codec import PowerConsul_KVCodec, FLAG_MAGIC, TYPE_STRING
+from powerconsul.kvdb.datatypes import Timestamp_Data
+
+class TestKVCodec(unittest.TestCase):
+    """
+    Typed KV value encoding.
+    """
+    def roundtrip(self, value):
+        data, flags = PowerConsul_KVCodec.dump(value)
+        return PowerConsul_KVCodec.load(data, flags)
+
+    def test_typed(self):
+        for value in [True, False, 0, 42, -7, 3.5, {'active_nodes': ['node1']}, ['a', 'b'], {}]:
+            self.assertEqual(self.roundtrip(value), value)
+            self.assertEqual(type(self.roundtrip(value)), type(value))
+
+    def test_timestamp(self):
+        value = Timestamp_Data('2016-01-01 00:00:00')
+        self.assertEqual(repr(self.roundtrip(value)), repr(value))
+
+    def test_strings_untagged(self):
+        for value in ['START', 'NULL', '/usr/bin/env service apache2 start', '']:
+            self.assertEqual(PowerConsul_KVCodec.dump(value), (value, 0))
+            self.assertEqual(self.roundtrip(value), value)
+
+    def test_strings_legacy(self):
+
+        # Pre-serialized and legacy string values decode as before
+        self.assertEqual(self.roundtrip('{"active_nodes": ["node1"]}'), {'active_nodes': ['node1']})
+        self.assertEqual(self.roundtrip('true'), True)
+        self.assertEqual(self.roundtrip('0'), False)
+        self.assertEqual(self.roundtrip('2.5'), 2.5)
+
+    def test_string_tag_sniffed(self):
+
+        # Values tagged as strings by earlier writes are sniffed
+        self.assertEqual(PowerConsul_KVCodec.load('{"a": 1}', FLAG_MAGIC | TYPE_STRING), {'a': 1})
+
+    def test_untagged(self):
+        self.assertEqual(PowerConsul_KVCodec.load('START'), 'START')
+        self.assertEqual(PowerConsul_KVCodec.load('[1, 2]', 0), [1, 2])
+        self.assertEqual(PowerConsul_KVCodec.load(None), None)
+
+if __name__ == '__main__':
+    unittest.main()
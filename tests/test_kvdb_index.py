@@ -0,0 +1,69 @@
+import unittest
+
+from fakes import FakeConsul, isolate
+from powerconsul.kvdb import PowerConsul_KVDB, PowerConsul_KVDB_Conflict
+
+class TestKVDBIndexCache(unittest.TestCase):
+    """
+    Modify index reuse and check-and-set writes.
+    """
+    def setUp(self):
+        isolate(self)
+        self.consul = FakeConsul()
+        self.consul.seed('cluster/web', '{"active_nodes": ["node1"]}')
+
+    def kvdb(self, **kwargs):
+        kv      = PowerConsul_KVDB(api=self.consul, **kwargs)
+        kv._dcs = self.consul.dcs
+        return kv
+
+    def test_local_get_all_dcs_put(self):
+        kv = self.kvdb(put_local=False)
+        self.assertEqual(kv.get('cluster/web'), {'active_nodes': ['node1']})
+
+        # Only the remote datacenter needs a fresh index
+        del self.consul.requests[:]
+        PowerConsul_KVDB.check(kv.put('cluster/web', {'active_nodes': ['node2']}))
+        self.assertEqual(self.consul.count('get', '/v1/kv/'), 1)
+        self.assertEqual([r[2] for r in self.consul.requests if r[0] == 'get' and r[1].startswith('/v1/kv/')], ['dc2'])
+
+    def test_get_all_local_put(self):
+        kv = self.kvdb()
+        kv.get_all('cluster/web')
+
+        # Index read from the local datacenter by name is reused by a local put
+        del self.consul.requests[:]
+        self.assertTrue(kv.put('cluster/web', 'x'))
+        self.assertEqual(self.consul.count('get', '/v1/kv/'), 0)
+
+    def test_stale_index_conflict(self):
+        kv = self.kvdb(put_local=False)
+        kv.get('cluster/web')
+        self.consul._set('dc1', 'cluster/web', '{"active_nodes": ["node3"]}')
+
+        # Concurrent update is reported, not overwritten
+        results = kv.put('cluster/web', {'active_nodes': ['node2']})
+        self.assertTrue(results['dc1']['conflict'])
+        self.assertTrue(results['dc2']['success'])
+        self.assertEqual(self.consul.stores['dc1']['cluster/web']['Value'], '{"active_nodes": ["node3"]}')
+        self.assertRaises(PowerConsul_KVDB_Conflict, PowerConsul_KVDB.check, results)
+
+    def test_stale_index_conflict_local(self):
+        kv = self.kvdb()
+        kv.get('cluster/web')
+        self.consul._set('dc1', 'cluster/web', 'changed')
+        self.assertRaises(PowerConsul_KVDB_Conflict, kv.put, 'cluster/web', 'x')
+
+        # Index is not reused after a conflict, a fresh read succeeds
+        self.assertTrue(kv.put('cluster/web', 'x'))
+
+    def test_new_key(self):
+        kv = self.kvdb()
+        self.assertTrue(kv.put('cluster/new', 'x'))
+        self.assertEqual(self.consul.stores['dc1']['cluster/new']['Value'], 'x')
+
+    def test_get_missing(self):
+        self.assertEqual(self.kvdb().get('cluster/missing'), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+
+from fakes import FakeConsul, isolate
+from powerconsul.kvdb import PowerConsul_KVDB, TXN_MAX_OPS
+
+class TestKVDBPutMany(unittest.TestCase):
+    """
+    Transaction writes with PowerConsul_KVDB.put_many.
+    """
+    def setUp(self):
+        isolate(self)
+        self.consul = FakeConsul()
+        self.kv     = PowerConsul_KVDB(put_local=False, base_path='service/web', api=self.consul)
+        self.kv._dcs = self.consul.dcs
+
+    def test_chunks(self):
+        items   = dict(('flags/node{0}'.format(i), 'START') for i in range(TXN_MAX_OPS + 6))
+        results = self.kv.put_many(items)
+
+        # One recursive index read of the parent and two transactions per datacenter
+        for dc in self.consul.dcs:
+            self.assertEqual(results[dc]['applied'], len(items))
+            self.assertTrue(results[dc]['success'])
+            self.assertEqual(len(self.consul.stores[dc]), len(items))
+        self.assertEqual(self.consul.count('put', '/v1/txn'), 2 * len(self.consul.dcs))
+        self.assertEqual(self.consul.count('get', '/v1/kv/'), len(self.consul.dcs))
+
+    def test_unrelated_keys(self):
+        self.kv.put_many({'node1/promote': 'START', 'node2/demote': 'START', 'node2/promote': 'START'})
+
+        # Sibling keys share one read of their parent, never a read of a wider prefix
+        for dc in self.consul.dcs:
+            reads = sorted(r[1] for r in self.consul.requests if r[0] == 'get' and r[2] == dc)
+            self.assertEqual(reads, ['/v1/kv/service/web/node1/promote', '/v1/kv/service/web/node2/'])
+
+    def test_index(self):
+        results = self.kv.put_many({'node1/promote': 'START', 'node2/promote': 'START'})
+        for dc in self.consul.dcs:
+            self.assertEqual(results[dc]['index'], max(e['ModifyIndex'] for e in self.consul.stores[dc].values()))
+
+    def test_cas_existing(self):
+        self.consul.seed('service/web/node1/promote', 'NULL')
+        results = self.kv.put_many({'node1/promote': 'START'})
+        for dc in self.consul.dcs:
+            self.assertTrue(results[dc]['success'])
+            self.assertEqual(self.consul.stores[dc]['service/web/node1/promote']['Value'], 'START')
+
+    def test_conflict(self):
+        self.consul.seed('service/web/node1/promote', 'NULL')
+
+        # Index seen by this instance is stale in one datacenter
+        self.kv.get_all('node1/promote')
+        self.consul._set('dc2', 'service/web/node1/promote', 'WAIT')
+        results = self.kv.put_many({'node1/promote': 'START', 'node2/promote': 'START'})
+
+        # Rolled back in dc2, concurrent update kept
+        self.assertTrue(results['dc1']['success'])
+        self.assertFalse(results['dc2']['success'])
+        self.assertTrue(results['dc2']['conflict'])
+        self.assertEqual(results['dc2']['applied'], 0)
+        self.assertEqual(self.consul.stores['dc2']['service/web/node1/promote']['Value'], 'WAIT')
+        self.assertFalse('service/web/node2/promote' in self.consul.stores['dc2'])
+
+    def test_partial_chunks(self):
+        items = dict(('node{0:03d}/promote'.format(i), 'START') for i in range(TXN_MAX_OPS + 1))
+
+        # Last key created concurrently after the indexes were read
+        last  = 'service/web/node{0:03d}/promote'.format(TXN_MAX_OPS)
+        read  = self.kv._txn_indexes
+        def _indexes(keys, dc=None):
+            indexes = read(keys, dc)
+            self.consul._set(dc, last, 'WAIT')
+            return indexes
+        self.kv._txn_indexes = _indexes
+        results = self.kv.put_many(items)
+
+        # First chunk stays applied and is reported
+        for dc in self.consul.dcs:
+            self.assertFalse(results[dc]['success'])
+            self.assertEqual(results[dc]['applied'], TXN_MAX_OPS)
+        self.assertRaises(Exception, PowerConsul_KVDB.check, results)
+
+if __name__ == '__main__':
+    unittest.main()
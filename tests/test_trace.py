@@ -0,0 +1,152 @@
+import os
+import json
+import fcntl
+import unittest
+from shutil import rmtree
+from tempfile import mkdtemp
+
+import powerconsul.common.trace
+from powerconsul.common.trace import PowerConsul_Trace
+
+class TestTrace(unittest.TestCase):
+    """
+    Span tracing written as JSON lines by PowerConsul_Trace.flush.
+    """
+    def setUp(self):
+        tmp = mkdtemp()
+        self.addCleanup(rmtree, tmp, True)
+        self.addCleanup(PowerConsul_Trace.reset)
+
+        # New trace written to a temporary directory
+        PowerConsul_Trace.reset()
+        PowerConsul_Trace.path = os.path.join(tmp, 'trace', 'trace.jsonl')
+
+    def spans(self):
+        with open(PowerConsul_Trace.path) as f:
+            return dict((span['name'], span) for span in [json.loads(line) for line in f])
+
+    def test_nested(self):
+        with PowerConsul_Trace.span('outer', command='check'):
+            with PowerConsul_Trace.span('inner'):
+                PowerConsul_Trace.annotate(role='primary')
+        self.assertTrue(PowerConsul_Trace.flush())
+
+        spans = self.spans()
+        self.assertEqual(spans['outer']['parent'], None)
+        self.assertEqual(spans['inner']['parent'], spans['outer']['span'])
+        self.assertEqual(spans['inner']['trace'], spans['outer']['trace'])
+        self.assertEqual(spans['outer']['attributes']['command'], 'check')
+        self.assertEqual(spans['inner']['attributes']['role'], 'primary')
+        for span in spans.values():
+            self.assertEqual(span['status'], 'ok')
+            self.assertTrue(span['end'] >= span['start'])
+            self.assertTrue('api_calls' in span['attributes'])
+
+    def test_status(self):
+        try:
+            with PowerConsul_Trace.span('failed'):
+                raise ValueError('bad value')
+        except ValueError:
+            pass
+        try:
+            with PowerConsul_Trace.span('exited'):
+                raise SystemExit(2)
+        except SystemExit:
+            pass
+        PowerConsul_Trace.flush()
+
+        spans = self.spans()
+        self.assertEqual(spans['failed']['status'], 'error')
+        self.assertEqual(spans['failed']['attributes']['error'], 'bad value')
+        self.assertEqual(spans['exited']['status'], 'exit')
+
+    def test_tags(self):
+        PowerConsul_Trace.tag(service='web')
+        with PowerConsul_Trace.span('check', service='db'):
+            pass
+        self.assertEqual(PowerConsul_Trace.traced('probe')(lambda: 'done')(), 'done')
+        PowerConsul_Trace.flush()
+
+        # Span attributes take precedence over invocation tags
+        spans = self.spans()
+        self.assertEqual(spans['check']['attributes']['service'], 'db')
+        self.assertEqual(spans['probe']['attributes']['service'], 'web')
+
+    def test_flush_open(self):
+        span = PowerConsul_Trace.span('open')
+        span.__enter__()
+        PowerConsul_Trace.flush()
+
+        # Open spans are ended before writing, and only written once
+        self.assertEqual(self.spans()['open']['status'], 'exit')
+        span.__exit__(None, None, None)
+        PowerConsul_Trace.flush()
+        with open(PowerConsul_Trace.path) as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+    def test_append(self):
+        for name in ['first', 'second']:
+            with PowerConsul_Trace.span(name):
+                pass
+            PowerConsul_Trace.flush()
+        with open(PowerConsul_Trace.path) as f:
+            self.assertEqual([json.loads(line)['name'] for line in f], ['first', 'second'])
+
+    def names(self, path):
+        with open(path) as f:
+            return [json.loads(line)['name'] for line in f]
+
+    def rotate_at(self, size):
+        max_bytes = powerconsul.common.trace.TRACE_MAX_BYTES
+        powerconsul.common.trace.TRACE_MAX_BYTES = size
+        self.addCleanup(setattr, powerconsul.common.trace, 'TRACE_MAX_BYTES', max_bytes)
+
+    def test_rotate(self):
+        self.rotate_at(10)
+        for name in ['first', 'second', 'third']:
+            with PowerConsul_Trace.span(name):
+                pass
+            PowerConsul_Trace.flush()
+
+        # Full file moved to the backup before writing, new spans go to a new file
+        self.assertEqual(self.names(PowerConsul_Trace.path), ['third'])
+        self.assertEqual(self.names('{0}.1'.format(PowerConsul_Trace.path)), ['second'])
+
+    def test_rotated_while_waiting(self):
+        self.rotate_at(10)
+        with PowerConsul_Trace.span('first'):
+            pass
+        PowerConsul_Trace.flush()
+
+        # Another process rotates the file while this one waits for the lock
+        class RotatingLock(object):
+            LOCK_EX = fcntl.LOCK_EX
+            rotated = []
+            @classmethod
+            def flock(cls, f, op):
+                if not cls.rotated:
+                    cls.rotated.append(True)
+                    os.rename(PowerConsul_Trace.path, '{0}.1'.format(PowerConsul_Trace.path))
+                fcntl.flock(f, op)
+        powerconsul.common.trace.fcntl = RotatingLock
+        self.addCleanup(setattr, powerconsul.common.trace, 'fcntl', fcntl)
+        with PowerConsul_Trace.span('second'):
+            pass
+        PowerConsul_Trace.flush()
+
+        self.assertEqual(self.names(PowerConsul_Trace.path), ['second'])
+        self.assertEqual(self.names('{0}.1'.format(PowerConsul_Trace.path)), ['first'])
+
+    def test_disabled(self):
+        path = PowerConsul_Trace.path
+        PowerConsul_Trace.reset()
+        with PowerConsul_Trace.span('untraced'):
+            pass
+
+        # Nothing written without a trace file, spans are dropped
+        self.assertTrue(PowerConsul_Trace.flush())
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(PowerConsul_Trace._spans, [])
+
+if __name__ == '__main__':
+    unittest.main()